@@ -1,15 +1,21 @@
 # pylint: disable=logging-fstring-interpolation
 
 import asyncio
+import functools
+import logging
 import os
 import sys
+import threading
+import time
 
+from collections import OrderedDict
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
 from typing import Any
 
 import click
-import logging
-import sys
+import orjson
 import uvicorn
 
 from a2a.server.apps import A2AStarletteApplication
@@ -20,6 +26,8 @@ from a2a.types import (
     AgentCard,
     AgentSkill,
 )
+
+
 # Ensure intra-package imports work when run as a script
 if __package__ is None or __package__ == '':
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -28,27 +36,31 @@ from agent_executor import (
     AirbnbAgentExecutor,
 )
 from base_agent import BaseAgent
+from common_utils.erc8004_adapter import get_default_adapter
 from dotenv import load_dotenv
+from finder_agent import FinderAgent
 from langchain_mcp_adapters.client import MultiServerMCPClient
+from reserve_agent import ReserveAgent
 from starlette.applications import Starlette
+from starlette.middleware import Middleware
 from starlette.requests import Request
-from starlette.responses import JSONResponse
+from starlette.responses import Response
 from starlette.routing import Mount, Route
-from common_utils.erc8004_adapter import Erc8004Adapter
-from eth_account.messages import encode_defunct
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 
-load_dotenv(override=True)
+try:
+    import uvloop
+except ImportError:  # uvloop is not available on every platform (e.g. Windows)
+    uvloop = None
 
-# Ensure INFO logs from agent modules are emitted
-logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(name)s:%(message)s')
+load_dotenv(override=True)
 
-# Ensure prints flush immediately
-try:
-    sys.stdout.reconfigure(line_buffering=True)
-    sys.stderr.reconfigure(line_buffering=True)
-except Exception:
-    pass
+# Agent-module INFO logs are only emitted when DEBUG is set
+logging.basicConfig(
+    level=logging.INFO if os.getenv('DEBUG') else logging.WARNING,
+    format='%(levelname)s:%(name)s:%(message)s',
+)
 
 SERVER_CONFIGS = {
     'bnb': {
@@ -65,26 +77,145 @@ DEFAULT_HOST = '0.0.0.0'
 DEFAULT_PORT = 10002
 DEFAULT_LOG_LEVEL = 'info'
 
+# ERC-8004 registrations are effectively static per (port, variant); cache the
+# built registration so card fetches don't pay an RPC lookup + ECDSA signature.
+REGISTRATION_TTL_SEC = float(os.getenv('ERC8004_REGISTRATION_TTL_SEC', '300'))
+_registration_cache: dict[tuple[int, str], tuple[float, dict[str, Any] | None]] = {}
+# Serialized agent-card bodies keyed by (host, port, variant), refreshed with the
+# registration. The host comes from the client's Host header, so the cache is an
+# LRU bounded like get_agent_card's; it is also filled from worker threads.
+_CARD_BODY_CACHE_MAX = 32
+_card_body_cache: OrderedDict[tuple[str, int, str], tuple[float, bytes]] = OrderedDict()
+_card_body_lock = threading.Lock()
+
+AGENT_CARD_PATH = '/.well-known/agent-card.json'
+_VARIANT_ROOTS = frozenset({'/finder', '/reserve'})
+_VARIANT_PREFIXES = ('/finder/', '/reserve/')
+# Agent classes per variant; '--variant both' serves all of them from one process
+_AGENT_CLASSES: dict[str, type[BaseAgent]] = {
+    'finder': FinderAgent,
+    'reserve': ReserveAgent,
+}
+
+
+class HostVariantMiddleware:
+    """Prefix un-prefixed paths with the variant implied by the Host header.
+
+    Requests to ``reserve.<host>`` are routed to ``/reserve``, everything else to
+    ``/finder``, so the Starlette router can dispatch purely on path. With
+    ``fixed_variant`` set, every un-prefixed path goes to that variant.
+    """
+
+    def __init__(self, app: ASGIApp, fixed_variant: str | None = None) -> None:
+        self.app = app
+        self.fixed_prefix = f'/{fixed_variant}' if fixed_variant else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] in ('http', 'websocket'):
+            path = scope['path']
+            if path in _VARIANT_ROOTS:
+                # Avoid a trailing-slash redirect for JSON-RPC posts to the mount root
+                scope['path'] = path + '/'
+            elif self.fixed_prefix is not None:
+                if not path.startswith(_VARIANT_PREFIXES):
+                    scope['path'] = self.fixed_prefix + path
+            elif not path.startswith(_VARIANT_PREFIXES):
+                # ASGI header names are already lowercased; only decode the Host value
+                host_header = ''
+                for k, v in scope['headers']:
+                    if k == b'host':
+                        host_header = v.decode('latin-1')
+                        break
+                host_only = host_header.split(':', 1)[0].lower()
+                prefix = '/reserve' if host_only.startswith('reserve.') else '/finder'
+                scope['path'] = prefix + path
+        await self.app(scope, receive, send)
+
+
+class DeferredAgentApp:
+    """ASGI app built on first request, once the shared agents have loaded.
+
+    Lets the server bind and answer agent-card requests while MCP tools are
+    still starting; agent requests wait on ``agents_task`` instead. If loading
+    failed, agent requests get a 503 (the failure is logged once, when the
+    task finishes).
+    """
+
+    def __init__(
+        self,
+        agents_task: asyncio.Task,
+        build: Callable[[dict[str, BaseAgent]], ASGIApp],
+    ) -> None:
+        self._agents_task = agents_task
+        self._build = build
+        self._app: ASGIApp | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if self._app is None:
+            try:
+                # Shielded so a client disconnect can't cancel the shared preload
+                agents = await asyncio.shield(self._agents_task)
+            except Exception:
+                response = Response(
+                    'Agent failed to initialize', status_code=503, media_type='text/plain'
+                )
+                await response(scope, receive, send)
+                return
+            if self._app is None:
+                self._app = self._build(agents)
+        await self._app(scope, receive, send)
+
+
+async def _load_agents(
+    mcp_client: MultiServerMCPClient,
+    context: dict[str, Any],
+    variants: tuple[str, ...],
+) -> dict[str, BaseAgent]:
+    """Preload MCP tools and build each requested agent variant once."""
+    mcp_tools = await mcp_client.get_tools()
+    context['mcp_tools'] = mcp_tools
+
+    tool_count = len(mcp_tools) if mcp_tools else 0
+    print(f'Lifespan: MCP Tools preloaded successfully ({tool_count} tools found).')
+    if not mcp_tools:
+        print(
+            'Warning: MCP tools were not loaded. Agent may not function correctly.',
+            file=sys.stderr,
+        )
+
+    # Executors share these instances
+    return {v: _AGENT_CLASSES[v](mcp_tools) for v in variants}
+
 
 @asynccontextmanager
-async def app_lifespan(context: dict[str, Any]):
+async def app_lifespan(
+    context: dict[str, Any], variants: tuple[str, ...] = tuple(_AGENT_CLASSES)
+):
     """Manages the lifecycle of shared resources like the MCP client and tools."""
     print('Lifespan: Initializing MCP client and tools...')
 
+    # Sized default executor so run_in_executor(None, ...) keeps blocking
+    # ERC-8004 RPC/signing work off the event loop
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=max(8, (os.cpu_count() or 1) * 2),
+            thread_name_prefix='erc8004',
+        )
+    )
+
     # This variable will hold the MultiServerMCPClient instance
     mcp_client_instance: MultiServerMCPClient | None = None
+    agents_task: asyncio.Task | None = None
 
     try:
         # Following Option 1 from the error message for MultiServerMCPClient initialization:
         # 1. client = MultiServerMCPClient(...)
         mcp_client_instance = MultiServerMCPClient(SERVER_CONFIGS)
-        mcp_tools = await mcp_client_instance.get_tools()
-        context['mcp_tools'] = mcp_tools
-
-        tool_count = len(mcp_tools) if mcp_tools else 0
-        print(
-            f'Lifespan: MCP Tools preloaded successfully ({tool_count} tools found).'
+        # The MCP server (npx) cold start runs concurrently with the Uvicorn bind
+        agents_task = asyncio.create_task(
+            _load_agents(mcp_client_instance, context, variants)
         )
+        context['agents_task'] = agents_task
         yield  # Application runs here
     except Exception as e:
         print(f'Lifespan: Error during initialization: {e}', file=sys.stderr)
@@ -92,6 +223,8 @@ async def app_lifespan(context: dict[str, Any]):
         # The finally block below will handle this.
         raise
     finally:
+        if agents_task is not None and not agents_task.done():
+            agents_task.cancel()
         print('Lifespan: Shutting down MCP client...')
         if (
             mcp_client_instance
@@ -134,96 +267,102 @@ def main(
     host: str = DEFAULT_HOST,
     port: int = DEFAULT_PORT,
     log_level: str = DEFAULT_LOG_LEVEL,
-    variant: str = 'finder',
+    variant: str = 'both',
 ):
     """Command Line Interface to start the Airbnb Agent server."""
     # Verify OpenAI API key is set.
     if not os.getenv('OPENAI_API_KEY'):
         raise ValueError('OPENAI_API_KEY environment variable not set.')
 
-    async def run_server_async():
-        async with app_lifespan(app_context):
-            if not app_context.get('mcp_tools'):
-                print(
-                    'Warning: MCP tools were not loaded. Agent may not function correctly.',
-                    file=sys.stderr,
-                )
-                # Depending on requirements, you could sys.exit(1) here
+    # A single-variant process only builds and mounts that variant
+    variants = tuple(_AGENT_CLASSES) if variant == 'both' else (variant,)
 
-            # Build two inner apps (finder/reserve) and dispatch by Host header
-            airbnb_agent_executor_finder = AirbnbAgentExecutor(
-                mcp_tools=app_context.get('mcp_tools', []), variant='finder'
-            )
-            airbnb_agent_executor_reserve = AirbnbAgentExecutor(
-                mcp_tools=app_context.get('mcp_tools', []), variant='reserve'
+    async def run_server_async():
+        async with app_lifespan(app_context, variants):
+            # Warm the ERC-8004 registration cache so card requests only do a dict
+            # lookup; the registry RPCs run off the event loop
+            await asyncio.gather(
+                *(asyncio.to_thread(_get_cached_registration, port, v) for v in variants)
             )
 
-            request_handler_finder = DefaultRequestHandler(
-                agent_executor=airbnb_agent_executor_finder,
-                task_store=InMemoryTaskStore(),
-            )
-            request_handler_reserve = DefaultRequestHandler(
-                agent_executor=airbnb_agent_executor_reserve,
-                task_store=InMemoryTaskStore(),
-            )
+            def build_inner(
+                agents: dict[str, BaseAgent], agent_variant: str
+            ) -> ASGIApp:
+                request_handler = DefaultRequestHandler(
+                    agent_executor=AirbnbAgentExecutor(agent=agents[agent_variant]),
+                    task_store=InMemoryTaskStore(),
+                )
+                a2a_server = A2AStarletteApplication(
+                    agent_card=get_agent_card(host, port, agent_variant),
+                    http_handler=request_handler,
+                )
+                return a2a_server.build()
+
+            async def agent_card_endpoint(request: Request) -> Response:
+                # Compute card dynamically based on Host; the variant comes from
+                # the path prefix (set by HostVariantMiddleware when absent)
+                host_only = request.headers.get('host', '').split(':', 1)[0].lower()
+                server = request.scope.get('server')
+                req_port = server[1] if isinstance(server, (list, tuple)) and len(server) > 1 else port
+                variant_prefix = request.url.path.split('/', 2)[1]
+                body = _cached_card_body(host_only, req_port, variant_prefix)
+                if body is None:
+                    # A rebuild may do a registry RPC and a signature; keep it off the loop
+                    body = await asyncio.to_thread(
+                        _get_agent_card_body, host_only, req_port, variant_prefix
+                    )
+                return Response(body, media_type='application/json')
+
+            # One inner app per variant, mounted by path prefix; each is built
+            # once the agents finish loading
+            agents_task = app_context['agents_task']
+            routes: list[Route | Mount] = []
+            for v in variants:
+                routes.append(Route(f'/{v}{AGENT_CARD_PATH}', agent_card_endpoint))
+                routes.append(
+                    Mount(
+                        f'/{v}',
+                        app=DeferredAgentApp(
+                            agents_task,
+                            functools.partial(build_inner, agent_variant=v),
+                        ),
+                    )
+                )
 
-            a2a_server_finder = A2AStarletteApplication(
-                agent_card=get_agent_card(host, port, 'finder'),
-                http_handler=request_handler_finder,
-            )
-            a2a_server_reserve = A2AStarletteApplication(
-                agent_card=get_agent_card(host, port, 'reserve'),
-                http_handler=request_handler_reserve,
+            app = Starlette(
+                routes=routes,
+                middleware=[
+                    Middleware(
+                        HostVariantMiddleware,
+                        fixed_variant=None if variant == 'both' else variant,
+                    )
+                ],
             )
 
-            inner_finder = a2a_server_finder.build()
-            inner_reserve = a2a_server_reserve.build()
-
-            async def app(scope, receive, send):
-                if scope.get('type') != 'http':
-                    return await inner_finder(scope, receive, send)
-                headers = {k.decode().lower(): v.decode() for k, v in scope.get('headers', [])}
-                host_header = headers.get('host', '')
-                # Parse host without port
-                host_only = host_header.split(':', 1)[0].lower()
-                path = scope.get('path', '/')
-                # Support prefixed agent-card paths to avoid DNS dependencies
-                if path in ('/.well-known/agent-card.json', '/finder/.well-known/agent-card.json', '/reserve/.well-known/agent-card.json'):
-                    # Compute card dynamically based on Host
-                    server = scope.get('server') or (host_only, port)
-                    req_port = server[1] if isinstance(server, (list, tuple)) and len(server) > 1 else port
-                    if path.startswith('/reserve/'):
-                        inferred_variant = 'reserve'
-                    elif path.startswith('/finder/'):
-                        inferred_variant = 'finder'
-                    else:
-                        inferred_variant = 'reserve' if host_only.startswith('reserve.') else 'finder'
-                    card_dict = get_agent_card_dict(host_only, req_port, inferred_variant)
-                    response = JSONResponse(card_dict)
-                    return await response(scope, receive, send)
-                # Route all other requests to the appropriate inner app
-                if path.startswith('/reserve'):
-                    # strip prefix for inner app
-                    scope2 = dict(scope)
-                    scope2['path'] = path[len('/reserve'):] or '/'
-                    return await inner_reserve(scope2, receive, send)
-                if path.startswith('/finder'):
-                    scope2 = dict(scope)
-                    scope2['path'] = path[len('/finder'):] or '/'
-                    return await inner_finder(scope2, receive, send)
-                target = inner_reserve if host_only.startswith('reserve.') else inner_finder
-                return await target(scope, receive, send)
-
             config = uvicorn.Config(
                 app=app,
                 host=host,
                 port=port,
                 log_level=log_level.lower(),
                 lifespan='auto',
+                http='httptools',
+                access_log=False,
             )
 
             uvicorn_server = uvicorn.Server(config)
 
+            def on_agents_loaded(task: asyncio.Task) -> None:
+                # A failed preload stops the server instead of serving 503s forever
+                if task.cancelled() or task.exception() is None:
+                    return
+                print(
+                    f'Lifespan: Error during initialization: {task.exception()!r}',
+                    file=sys.stderr,
+                )
+                uvicorn_server.should_exit = True
+
+            agents_task.add_done_callback(on_agents_loaded)
+
             print(
                 f'Starting Uvicorn server at http://{host}:{port} [{variant}] with log-level {log_level}...'
             )
@@ -234,9 +373,16 @@ def main(
             finally:
                 print('Uvicorn server has stopped.')
                 # The app_lifespan's finally block handles mcp_client shutdown
+            if agents_task.done() and not agents_task.cancelled():
+                # Surfaces a failed preload through main()'s error exit
+                agents_task.result()
 
     try:
-        asyncio.run(run_server_async())
+        # Uvicorn's `loop` setting is ignored by Server.serve(), so select uvloop here
+        asyncio.run(
+            run_server_async(),
+            loop_factory=uvloop.new_event_loop if uvloop is not None else None,
+        )
     except RuntimeError as e:
         if 'cannot be called from a running event loop' in str(e):
             print(
@@ -251,6 +397,7 @@ def main(
         sys.exit(1)
 
 
+@functools.lru_cache(maxsize=32)
 def get_agent_card(host: str, port: int, variant: str):
     """Returns the Agent Card for the Currency Agent."""
     capabilities = AgentCapabilities(streaming=True, push_notifications=True)
@@ -291,9 +438,10 @@ def get_agent_card(host: str, port: int, variant: str):
 def get_agent_card_dict(host: str, port: int, variant: str) -> dict[str, Any]:
     """Build AgentCard dict and augment with ERC-8004 registration and trust models."""
     base_card = get_agent_card(host, port, variant)
-    card_dict = base_card.model_dump(exclude_none=True)
+    # pydantic-core emits JSON directly; the dict is only needed for augmentation
+    card_dict = orjson.loads(base_card.model_dump_json(exclude_none=True))
 
-    registration = _build_erc8004_registration(port, variant)
+    registration = _get_cached_registration(port, variant)
     if registration is not None:
         card_dict['registrations'] = [registration]
 
@@ -305,13 +453,69 @@ def get_agent_card_dict(host: str, port: int, variant: str) -> dict[str, Any]:
     return card_dict
 
 
+def _cached_card_body(host: str, port: int, variant: str) -> bytes | None:
+    """Return a fresh cached card body, or None if it must be rebuilt."""
+    key = (host, port, variant)
+    with _card_body_lock:
+        hit = _card_body_cache.get(key)
+        if hit is None or time.monotonic() - hit[0] >= REGISTRATION_TTL_SEC:
+            return None
+        _card_body_cache.move_to_end(key)
+        return hit[1]
+
+
+def _get_agent_card_body(host: str, port: int, variant: str) -> bytes:
+    """Return the agent card pre-serialized to JSON bytes."""
+    body = _cached_card_body(host, port, variant)
+    if body is not None:
+        return body
+    body = orjson.dumps(get_agent_card_dict(host, port, variant))
+    key = (host, port, variant)
+    with _card_body_lock:
+        _card_body_cache[key] = (time.monotonic(), body)
+        _card_body_cache.move_to_end(key)
+        while len(_card_body_cache) > _CARD_BODY_CACHE_MAX:
+            _card_body_cache.popitem(last=False)
+    return body
+
+
+def _get_cached_registration(port: int, variant: str) -> dict[str, Any] | None:
+    """Return the ERC-8004 registration for (port, variant), rebuilt after the TTL expires."""
+    key = (port, variant)
+    now = time.monotonic()
+    hit = _registration_cache.get(key)
+    if hit is not None and now - hit[0] < REGISTRATION_TTL_SEC:
+        return hit[1]
+    registration = _build_erc8004_registration(port, variant)
+    _registration_cache[key] = (now, registration)
+    return registration
+
+
+# domain -> (private_key, signature hex); the signature is fixed for a key/domain pair
+_domain_signature_cache: dict[str, tuple[str, str]] = {}
+
+
+def _sign_domain(domain: str, private_key: str) -> str:
+    """Sign the domain name with the agent key, reusing a prior signature."""
+    cached = _domain_signature_cache.get(domain)
+    if cached is not None and cached[0] == private_key:
+        return cached[1]
+    from eth_account import Account
+    from eth_account.messages import encode_defunct
+
+    signed = Account.sign_message(encode_defunct(text=domain), private_key=private_key)
+    signature = signed.signature.hex()
+    _domain_signature_cache[domain] = (private_key, signature)
+    return signature
+
+
 def _build_erc8004_registration(port: int, variant: str) -> dict[str, Any] | None:
     """Create ERC-8004 registration object with agentId, CAIP-10 address, and signature.
 
     Signature is over the agent domain name.
     """
     try:
-        adapter = Erc8004Adapter()
+        adapter = get_default_adapter()
 
         # Determine domain for lookup/signing
         if variant == 'reserve':
@@ -342,11 +546,7 @@ def _build_erc8004_registration(port: int, variant: str) -> dict[str, Any] | Non
         # Optional ownership signature over the domain
         if private_key:
             try:
-                from eth_account import Account
-
-                msg = encode_defunct(text=domain)
-                signed = Account.sign_message(msg, private_key=private_key)
-                registration['signature'] = signed.signature.hex()
+                registration['signature'] = _sign_domain(domain, private_key)
             except Exception:
                 pass
 
@@ -378,9 +578,9 @@ def _build_erc8004_registration(port: int, variant: str) -> dict[str, Any] | Non
 @click.option(
     '--variant',
     'variant',
-    type=click.Choice(['finder', 'reserve']),
-    default='finder',
-    help='Agent variant to run at this endpoint.',
+    type=click.Choice(['finder', 'reserve', 'both']),
+    default='both',
+    help='Agent variant to run at this endpoint (both: finder and reserve by Host).',
 )
 def cli(host: str, port: int, log_level: str, variant: str):
     main(host, port, log_level, variant)
@@ -1,6 +1,8 @@
 # pylint: disable=logging-fstring-interpolation
+import asyncio
 import logging
 import os
+import time
 
 from typing import Any, override
 
@@ -13,30 +15,88 @@ from a2a.types import (
     TaskStatusUpdateEvent,
 )
 from a2a.utils import new_agent_text_message, new_task, new_text_artifact
-from finder_agent import FinderAgent
+from base_agent import BaseAgent
 from reserve_agent import ReserveAgent
-from common_utils.erc8004_adapter import Erc8004Adapter
+from common_utils.erc8004_adapter import get_default_adapter
 
 
 logger = logging.getLogger(__name__)
 
+# Streamed "working" chunks are batched until this many chars or seconds pass
+STREAM_FLUSH_CHARS = 256
+STREAM_FLUSH_SEC = 0.05
+
+# Status templates; per-event copies only swap in the message
+_WORKING_STATUS = TaskStatus(state=TaskState.working)
+_INPUT_REQUIRED_STATUS = TaskStatus(state=TaskState.input_required)
+_COMPLETED_STATUS = TaskStatus(state=TaskState.completed)
+
 
 class AirbnbAgentExecutor(AgentExecutor):
     """AirbnbAgentExecutor that uses an agent with preloaded tools."""
 
-    def __init__(self, mcp_tools: list[Any], variant: str = 'finder'):
+    def __init__(self, agent: BaseAgent):
         """Initializes the AirbnbAgentExecutor.
 
         Args:
-            mcp_tools: A list of preloaded MCP tools for the AirbnbAgent.
+            agent: A preloaded Finder or Reserve agent, shared for the process lifetime.
         """
         super().__init__()
         logger.info(
-            f'Initializing AirbnbAgentExecutor with {len(mcp_tools) if mcp_tools else "no"} MCP tools.'
+            f'Initializing AirbnbAgentExecutor for {agent.variant} agent.'
         )
-        self.agent = (
-            ReserveAgent(mcp_tools) if variant == 'reserve' else FinderAgent(mcp_tools)
+        self.agent = agent
+        # Env is fixed after startup; snapshot what execute() needs
+        is_reserve = isinstance(agent, ReserveAgent)
+        variant_label = 'reserve' if is_reserve else 'finder'
+        # Fallback to variant label if domain not set
+        self._domain = (
+            os.getenv('RESERVE_DOMAIN' if is_reserve else 'FINDER_DOMAIN')
+            or variant_label
         )
+        # ERC-8004 adapter and this server's registry entry are reused across requests
+        self._adapter = get_default_adapter()
+        self._server_info: dict[str, Any] | None = None
+        self._server_info_lock = asyncio.Lock()
+        self._authorize_in_flight: set[tuple[int, int]] = set()
+        self._bg_tasks: set[asyncio.Task] = set()
+
+    async def _get_server_info(self) -> dict[str, Any] | None:
+        """Resolve (once) this server agent's ERC-8004 registry entry by domain."""
+        if self._server_info is not None:
+            return self._server_info
+        async with self._server_info_lock:
+            if self._server_info is None:
+                # Only successful lookups are cached so a later registration is picked up.
+                # Blocking RPC runs on the loop's default executor (set in app_lifespan)
+                self._server_info = await self._adapter.aget_agent_by_domain(self._domain)
+            return self._server_info
+
+    async def _authorize_bg(self, client_id_meta: str) -> None:
+        """Look up the client's FeedbackAuthID for this server off the request path."""
+        owned_key = None
+        try:
+            server_info = await self._get_server_info()
+            if not (server_info and server_info.get('agent_id')):
+                return
+            key = (int(client_id_meta), int(server_info['agent_id']))
+            # Skip if the same (client, server) check is already running
+            if key in self._authorize_in_flight:
+                return
+            self._authorize_in_flight.add(key)
+            owned_key = key
+            logger.info(
+                'ERC-8004: fetch FeedbackAuthID via getFeedbackAuthId (client=%s, server=%s)',
+                key[0],
+                key[1],
+            )
+            view_res = await self._adapter.acheck_feedback_authorized(*key)
+            logger.info('ERC-8004: check_feedback_authorized result: %s', view_res)
+        except Exception as e:
+            logger.info('ERC-8004: server-side authorize_feedback failed: %s', e)
+        finally:
+            if owned_key is not None:
+                self._authorize_in_flight.discard(owned_key)
 
     @override
     async def execute(
@@ -47,9 +107,7 @@ class AirbnbAgentExecutor(AgentExecutor):
         query = context.get_user_input()
         task = context.current_task
 
-        print('EXECUTE print reached:', query)
         logger.info('ERC-8004: execute query: %s', query)
-        logger.warning('EXECUTE REACHED: query=%s', query)
 
         if not context.message:
             raise Exception('No message provided')
@@ -59,43 +117,38 @@ class AirbnbAgentExecutor(AgentExecutor):
             await event_queue.enqueue_event(task)
 
         logger.info('ERC-8004: execute task: %s, %s', task, context.message)
-        # Server-side authorization: if caller provided client_agent_id, authorize now
-        try:
-            client_id_meta = None
-            if context.message and hasattr(context.message, 'metadata'):
-                client_id_meta = (context.message.metadata or {}).get('client_agent_id')
-            logger.info('ERC-8004: client_agent_id from metadata: %s', client_id_meta)
-            if client_id_meta and str(client_id_meta).strip():
-                adapter = Erc8004Adapter()
-                # Resolve server agent id by variant
-                server_domain = 'reserve' if isinstance(self.agent, ReserveAgent) else 'finder'
-                domain_env = 'RESERVE_DOMAIN' if isinstance(self.agent, ReserveAgent) else 'FINDER_DOMAIN'
-                domain_val = os.getenv(domain_env)
-                if not domain_val:
-                    # Fallback to variant label if domain not set
-                    domain_val = server_domain
-                server_info = adapter.get_agent_by_domain(domain_val)
-                if server_info and server_info.get('agent_id'):
-                    logger.info(
-                        'ERC-8004: fetch FeedbackAuthID via getFeedbackAuthId (client=%s, server=%s)',
-                        client_id_meta,
-                        server_info['agent_id'],
-                    )
-                    view_res = adapter.check_feedback_authorized(
-                        int(client_id_meta), int(server_info['agent_id'])
-                    )
-                    logger.info('ERC-8004: check_feedback_authorized result: %s', view_res)
-        except Exception as e:
-            logger.info('ERC-8004: server-side authorize_feedback failed: %s', e)
+        # Server-side authorization: if caller provided client_agent_id, check it in
+        # the background so chain latency stays off the streaming path
+        client_id_meta = None
+        if context.message and hasattr(context.message, 'metadata'):
+            client_id_meta = (context.message.metadata or {}).get('client_agent_id')
+        logger.info('ERC-8004: client_agent_id from metadata: %s', client_id_meta)
+        if client_id_meta and str(client_id_meta).strip():
+            bg_task = asyncio.create_task(self._authorize_bg(str(client_id_meta)))
+            self._bg_tasks.add(bg_task)
+            bg_task.add_done_callback(self._bg_tasks.discard)
 
         # invoke the underlying agent, using streaming results
-        async for event in self.agent.stream(query, task.context_id):
+        context_id = task.context_id
+        task_id = task.id
+        # Intermediate "working" chunks are coalesced and flushed by size or age
+        pending: list[str] = []
+        pending_len = 0
+        last_flush = 0.0
+        async for event in self.agent.stream(query, context_id):
+            if event['is_task_complete'] or event['require_user_input']:
+                if pending:
+                    await event_queue.enqueue_event(
+                        self._working_event(''.join(pending), context_id, task_id)
+                    )
+                    pending.clear()
+                    pending_len = 0
             if event['is_task_complete']:
                 await event_queue.enqueue_event(
                     TaskArtifactUpdateEvent(
                         append=False,
-                        context_id=task.context_id,
-                        task_id=task.id,
+                        context_id=context_id,
+                        task_id=task_id,
                         last_chunk=True,
                         artifact=new_text_artifact(
                             name='current_result',
@@ -106,44 +159,76 @@ class AirbnbAgentExecutor(AgentExecutor):
                 )
                 await event_queue.enqueue_event(
                     TaskStatusUpdateEvent(
-                        status=TaskStatus(state=TaskState.completed),
+                        status=_COMPLETED_STATUS.model_copy(),
                         final=True,
-                        context_id=task.context_id,
-                        task_id=task.id,
+                        context_id=context_id,
+                        task_id=task_id,
                     )
                 )
             elif event['require_user_input']:
                 await event_queue.enqueue_event(
                     TaskStatusUpdateEvent(
-                        status=TaskStatus(
-                            state=TaskState.input_required,
-                            message=new_agent_text_message(
-                                event['content'],
-                                task.context_id,
-                                task.id,
-                            ),
+                        status=_INPUT_REQUIRED_STATUS.model_copy(
+                            update={
+                                'message': new_agent_text_message(
+                                    event['content'], context_id, task_id
+                                )
+                            }
                         ),
                         final=True,
-                        context_id=task.context_id,
-                        task_id=task.id,
+                        context_id=context_id,
+                        task_id=task_id,
                     )
                 )
             else:
-                await event_queue.enqueue_event(
-                    TaskStatusUpdateEvent(
-                        status=TaskStatus(
-                            state=TaskState.working,
-                            message=new_agent_text_message(
-                                event['content'],
-                                task.context_id,
-                                task.id,
-                            ),
-                        ),
-                        final=False,
-                        context_id=task.context_id,
-                        task_id=task.id,
+                content = event['content']
+                text = content if isinstance(content, str) else str(content)
+                now = time.perf_counter()
+                if event.get('is_status'):
+                    # Flush model tokens first so the tool status isn't glued onto them
+                    if pending:
+                        await event_queue.enqueue_event(
+                            self._working_event(''.join(pending), context_id, task_id)
+                        )
+                        pending.clear()
+                        pending_len = 0
+                    await event_queue.enqueue_event(
+                        self._working_event(text, context_id, task_id)
                     )
-                )
+                    last_flush = now
+                    continue
+                pending.append(text)
+                pending_len += len(text)
+                if (
+                    pending_len >= STREAM_FLUSH_CHARS
+                    or now - last_flush >= STREAM_FLUSH_SEC
+                ):
+                    await event_queue.enqueue_event(
+                        self._working_event(''.join(pending), context_id, task_id)
+                    )
+                    pending.clear()
+                    pending_len = 0
+                    last_flush = now
+        if pending:
+            await event_queue.enqueue_event(
+                self._working_event(''.join(pending), context_id, task_id)
+            )
+
+    @staticmethod
+    def _working_event(
+        text: str, context_id: str, task_id: str
+    ) -> TaskStatusUpdateEvent:
+        """Build a non-final "working" status update carrying streamed text."""
+        return TaskStatusUpdateEvent(
+            status=_WORKING_STATUS.model_copy(
+                update={
+                    'message': new_agent_text_message(text, context_id, task_id)
+                }
+            ),
+            final=False,
+            context_id=context_id,
+            task_id=task_id,
+        )
 
     @override
     async def cancel(
@@ -2,6 +2,7 @@
 # pylint: disable=logging-fstring-interpolation
 import logging
 import os
+import threading
 
 from collections.abc import AsyncIterable
 from typing import Any, Literal
@@ -27,11 +28,17 @@ except Exception:
 
 
 logger = logging.getLogger(__name__)
-if not logger.hasHandlers():
-    logging.basicConfig(level=logging.INFO)
 
 memory = MemorySaver()
 
+# On-chain identity registration (tx + receipt wait) runs on a daemon thread,
+# off the thread that builds the agent, so a pending receipt wait (up to
+# ERC8004_TX_TIMEOUT_SEC) never holds up interpreter shutdown
+def _start_identity_registration(target, *args, **kwargs) -> None:
+    threading.Thread(
+        target=target, args=args, kwargs=kwargs, name='erc8004-identity', daemon=True
+    ).start()
+
 
 class ResponseFormat(BaseModel):
     """Respond to the user in this format."""
@@ -81,7 +88,11 @@ class BaseAgent:
         # Variant is kept for subclasses to customize behavior/prompts
         self.variant = variant
 
-        # Initialize optional ERC-8004 adapter and ensure identity (no-op if disabled)
+        # Initialize optional ERC-8004 adapter and ensure identity; when disabled,
+        # skip building the adapter (env parsing, deployment.json, Web3 client)
+        self.erc8004 = None
+        if os.getenv('ERC8004_ENABLED', 'false').lower() != 'true':
+            return
         try:
             # Variant-specific private key and domain
             pk_env = 'ERC8004_PRIVATE_KEY_RESERVE' if self.variant == 'reserve' else 'ERC8004_PRIVATE_KEY_FINDER'
@@ -89,10 +100,12 @@ class BaseAgent:
             variant_pk = os.getenv(pk_env)
             variant_domain = os.getenv(dom_env)
             self.erc8004 = Erc8004Adapter(private_key=variant_pk)
-            self.erc8004.ensure_identity(
+            # Fire-and-forget: ensure_identity logs its own failures
+            _start_identity_registration(
+                self.erc8004.ensure_identity,
                 'Airbnb Agent - Reserve' if self.variant == 'reserve' else 'Airbnb Agent - Finder',
                 agent_domain=variant_domain,
-                signing_private_key=variant_pk
+                signing_private_key=variant_pk,
             )
         except Exception:
             self.erc8004 = None
@@ -319,11 +332,13 @@ class BaseAgent:
                 event_name = chunk.get('event')
                 data = chunk.get('data', {})
                 content_to_yield = None
+                is_status = False
 
                 if event_name == 'on_tool_start':
                     tool_name = data.get('name', 'a tool')
                     # tool_input = data.get("input", {}) # Could be verbose
                     content_to_yield = f'Using tool: {tool_name}...'
+                    is_status = True
                 elif event_name == 'on_chat_model_stream':
                     message_chunk = data.get('chunk')
                     if (
@@ -337,6 +352,8 @@ class BaseAgent:
                         'is_task_complete': False,
                         'require_user_input': False,
                         'content': content_to_yield,
+                        # Tool status lines aren't model tokens; the executor sends them on their own
+                        'is_status': is_status,
                     }
 
             # After all events, get the final structured response from the agent's state
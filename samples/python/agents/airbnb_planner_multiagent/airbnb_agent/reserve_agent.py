@@ -3,14 +3,7 @@ from typing import Any
 from base_agent import BaseAgent
 from langchain_core.tools import tool
 from pydantic import BaseModel
-import uuid
-import sys
-try:
-    from common_utils.erc8004_adapter import Erc8004Adapter  
-except Exception:
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-    from common_utils.erc8004_adapter import Erc8004Adapter  # type: ignore
+import secrets
 
 
 class ReserveRequest(BaseModel):
@@ -27,7 +20,7 @@ def reserve_listing(listing_url: str, check_in: str, check_out: str, guests: int
     Provide: listing_url, check_in (YYYY-MM-DD), check_out (YYYY-MM-DD), guests.
     Returns a confirmation with a mock booking ID and echo of the inputs.
     """
-    booking_id = uuid.uuid4().hex[:10]
+    booking_id = secrets.token_hex(5)
 
     return (
         f"Reservation confirmed.\n"
@@ -42,18 +35,20 @@ def reserve_listing(listing_url: str, check_in: str, check_out: str, guests: int
 class ReserveAgent(BaseAgent):
     """Reserve variant of the Airbnb agent with reservation tool."""
 
+    # Extend prompt for reservation behavior (built once, at class definition)
+    SYSTEM_INSTRUCTION = BaseAgent.SYSTEM_INSTRUCTION + (
+        "\n\nReservation mode: If the user asks to reserve one of the previously presented listings, "
+        "use the reserve_listing tool. Extract listing URL (or infer from context), check-in, check-out, and guests. "
+        "Confirm the reservation details in Markdown, including the booking ID returned by the tool."
+    )
+
     def __init__(self, mcp_tools: list[Any]):
         super().__init__(mcp_tools=mcp_tools, variant='reserve')
-        # Extend prompt and tools for reservation behavior
-        self.SYSTEM_INSTRUCTION += (
-            "\n\nReservation mode: If the user asks to reserve one of the previously presented listings, "
-            "use the reserve_listing tool. Extract listing URL (or infer from context), check-in, check-out, and guests. "
-            "Confirm the reservation details in Markdown, including the booking ID returned by the tool."
-        )
+        # Tool set is fixed per instance; compose it once
+        self._tools = [*super().get_tools(), reserve_listing]
 
     def get_tools(self) -> list[Any]:
-        tools = super().get_tools()
-        tools.append(reserve_listing)
-        return tools
+        """Return the MCP tools plus reserve_listing (shared list; do not mutate)."""
+        return self._tools
 
 
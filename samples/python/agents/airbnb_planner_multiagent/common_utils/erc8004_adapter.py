@@ -1,14 +1,300 @@
+import asyncio
+import functools
+import hashlib
 import logging
 import os
-from typing import Any, Optional
+import random
+import threading
+import time
 
-from web3 import Web3
-from web3.exceptions import TimeExhausted
+from collections.abc import Callable, Mapping
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional
+
+import orjson
+
+
+# web3 (and eth_abi/eth_account under it) is imported only once an RPC client is
+# built, so processes running without an RPC URL don't pay its import time
+if TYPE_CHECKING:
+    import requests
+
+    from web3 import Web3
 
 
 logger = logging.getLogger(__name__)
-if not logger.hasHandlers():
-    logging.basicConfig(level=logging.INFO)
+
+
+# Errors expected from registry view calls / log decoding; anything else propagates
+@functools.cache
+def _view_errors() -> tuple[type[Exception], ...]:
+    import requests
+
+    from web3.exceptions import BadFunctionCallOutput, ContractLogicError
+
+    return (ContractLogicError, BadFunctionCallOutput, ValueError, requests.RequestException)
+
+
+@functools.cache
+def _log_decode_errors() -> tuple[type[Exception], ...]:
+    from web3.exceptions import LogTopicError, MismatchedABI
+
+    return (LogTopicError, MismatchedABI, ValueError, KeyError)
+
+
+# Contract artifacts (often multi-MB) and deployment files don't change at
+# runtime; read and parse each once per process
+@functools.lru_cache(maxsize=None)
+def _cached_abi(contract_name: str) -> Optional[list]:
+    abi_path = Path(f"contracts/out/{contract_name}.sol/{contract_name}.json")
+    return orjson.loads(abi_path.read_bytes()).get('abi')
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_deployment(path: str) -> dict[str, Any]:
+    return orjson.loads(Path(path).read_bytes())
+
+
+# Selector of Solidity's Error(string) revert payload
+_ERROR_SELECTOR = bytes.fromhex('08c379a0')
+
+
+def _revert_reason(data: Any) -> Optional[str]:
+    """Decode an Error(string) revert payload (hex str or bytes), else None."""
+    if isinstance(data, str) and data.startswith('0x'):
+        try:
+            data = bytes.fromhex(data[2:])
+        except ValueError:
+            return None
+    if not isinstance(data, (bytes, bytearray)) or data[:4] != _ERROR_SELECTOR:
+        return None
+    from eth_abi import decode
+
+    try:
+        return decode(['string'], bytes(data[4:]))[0]
+    except Exception:
+        return None
+
+
+def _abi_function_names(abi: list) -> frozenset[str]:
+    return frozenset(item['name'] for item in abi if item.get('type') == 'function')
+
+
+def _encode_call(fn: Any) -> str:
+    """ABI-encode a bound contract call (selector + arguments) as hex calldata."""
+    from eth_abi import encode
+    from eth_utils import function_abi_to_4byte_selector
+    from eth_utils.abi import get_abi_input_types
+
+    selector = function_abi_to_4byte_selector(fn.abi)
+    return '0x' + (selector + encode(get_abi_input_types(fn.abi), fn.args)).hex()
+
+
+def _checksum_outputs(abi_type: Any, value: Any) -> Any:
+    """Checksum the addresses in a decoded value, as ``fn.call()`` returns them."""
+    from eth_abi.grammar import TupleType
+    from eth_utils import to_checksum_address
+
+    if abi_type.is_array:
+        return [_checksum_outputs(abi_type.item_type, v) for v in value]
+    if isinstance(abi_type, TupleType):
+        return tuple(_checksum_outputs(t, v) for t, v in zip(abi_type.components, value))
+    if abi_type.base == 'address':
+        return to_checksum_address(value)
+    return value
+
+
+def _auth_id_hex(fid: Any) -> Optional[str]:
+    """Format a FeedbackAuthID as 0x-prefixed hex, as read from the AuthFeedback log."""
+    if fid is None:
+        return None
+    h = fid.hex() if hasattr(fid, 'hex') else str(fid)
+    return h if h.startswith('0x') else f'0x{h}'
+
+
+def _gwei_to_wei(gwei: Optional[str]) -> Optional[int]:
+    return int(Decimal(gwei) * 10**9) if gwei else None
+
+
+def _env(name: str, cast: Callable[[str], Any], default: Any) -> Any:
+    """Parse an env var with ``cast``; unset, empty or malformed values give ``default``."""
+    raw = os.getenv(name, '').strip()
+    if not raw:
+        return default
+    try:
+        return cast(raw)
+    except (ArithmeticError, ValueError) as e:
+        # decimal.InvalidOperation is an ArithmeticError
+        logger.warning('ERC-8004: ignoring %s=%r (%s); using %r', name, raw, e, default)
+        return default
+
+
+@dataclass(frozen=True, slots=True)
+class _Cfg:
+    """Transaction/RPC tuning read from the environment once per adapter."""
+
+    gas_mult: float
+    # None means each path's own floor (500k for registration, 200k for authorization)
+    min_gas: Optional[int]
+    gas_price_mult: float
+    gas_price_override_wei: Optional[int]
+    reg_fee_eth: float
+    tx_timeout_sec: int
+    rpc_timeout_sec: int
+    # Receipt polling starts at receipt_poll_sec and backs off up to roughly one block interval
+    receipt_poll_sec: float
+    block_time_sec: float
+    # eth_gasPrice quotes are reused for about half a block
+    gas_price_ttl_sec: float
+    # Resolved domain -> agent entries are reused this long; unregistered domains
+    # are remembered for the shorter miss TTL so a new registration shows up soon
+    domain_cache_ttl_sec: float
+    domain_miss_ttl_sec: float
+    # Static EIP-1559 fee caps; when set, no gas price quote is fetched per tx
+    max_fee_wei: Optional[int]
+    max_priority_fee_wei: Optional[int]
+
+    @classmethod
+    def from_env(cls) -> '_Cfg':
+        max_fee_wei = _env('ERC8004_MAX_FEE_GWEI', _gwei_to_wei, None)
+        max_priority_fee_wei = None
+        if max_fee_wei is not None:
+            max_priority_fee_wei = min(
+                _env('ERC8004_MAX_PRIORITY_FEE_GWEI', _gwei_to_wei, 10**9), max_fee_wei
+            )
+        return cls(
+            gas_mult=_env('ERC8004_GAS_MULT', float, 1.5),
+            min_gas=_env('ERC8004_MIN_GAS', int, None),
+            gas_price_mult=_env('ERC8004_GAS_PRICE_MULT', float, 1.2),
+            gas_price_override_wei=_env('ERC8004_GAS_PRICE_GWEI', _gwei_to_wei, None),
+            reg_fee_eth=_env('ERC8004_REGISTRATION_FEE_ETH', float, 0.0),
+            tx_timeout_sec=_env('ERC8004_TX_TIMEOUT_SEC', int, 180),
+            rpc_timeout_sec=_env('ERC8004_RPC_TIMEOUT_SEC', int, 20),
+            receipt_poll_sec=_env('ERC8004_RECEIPT_POLL_SEC', float, 1.0),
+            block_time_sec=_env('ERC8004_BLOCK_TIME_SEC', float, 6.0),
+            gas_price_ttl_sec=_env('ERC8004_GAS_PRICE_TTL_SEC', float, 3.0),
+            domain_cache_ttl_sec=_env('ERC8004_DOMAIN_CACHE_TTL_SEC', float, 300.0),
+            domain_miss_ttl_sec=_env('ERC8004_DOMAIN_MISS_TTL_SEC', float, 30.0),
+            max_fee_wei=max_fee_wei,
+            max_priority_fee_wei=max_priority_fee_wei,
+        )
+
+
+# Gas estimates remembered per adapter
+GAS_LIMIT_CACHE_MAX = 128
+
+# Sleeps before each resolveByAddress read-back after newAgent is mined
+_RESOLVE_RETRY_DELAYS = (0.0, 0.5, 0.5)
+
+
+# Multicall3 is deployed at the same address on most EVM chains
+MULTICALL3_ADDRESS = '0xcA11bde05977b3631167028862bE2a173976CA11'
+_MULTICALL3_ABI = (
+    {
+        "inputs": [
+            {"internalType": "bool", "name": "requireSuccess", "type": "bool"},
+            {
+                "components": [
+                    {"internalType": "address", "name": "target", "type": "address"},
+                    {"internalType": "bytes", "name": "callData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Call[]",
+                "name": "calls",
+                "type": "tuple[]",
+            },
+        ],
+        "name": "tryAggregate",
+        "outputs": [
+            {
+                "components": [
+                    {"internalType": "bool", "name": "success", "type": "bool"},
+                    {"internalType": "bytes", "name": "returnData", "type": "bytes"},
+                ],
+                "internalType": "struct Multicall3.Result[]",
+                "name": "returnData",
+                "type": "tuple[]",
+            }
+        ],
+        "stateMutability": "payable",
+        "type": "function",
+    },
+)
+
+
+# Minimal registry ABI used when the IdentityRegistry artifact is unavailable
+_MIN_REGISTER_ABI = (
+    {
+        "inputs": [{"internalType": "string", "name": "name", "type": "string"}],
+        "name": "register",
+        "outputs": [{"internalType": "uint256", "name": "id", "type": "uint256"}],
+        "stateMutability": "nonpayable",
+        "type": "function",
+    },
+)
+
+
+@functools.cache
+def _rpc_session() -> 'requests.Session':
+    """Process-wide HTTP session for RPC providers: pooled keep-alive plus 429/5xx backoff.
+
+    Shared by every adapter (finder/reserve/assistant keys, default adapter) so
+    they all reuse one set of keep-alive connections instead of one pool each.
+    """
+    import requests
+
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    # JSON-RPC is all POST; re-sending a signed raw tx is idempotent (same hash)
+    retry = Retry(
+        total=3,
+        backoff_factor=0.2,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({'POST'}),
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retry)
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def _rpc_json_default(obj: Any) -> Any:
+    if isinstance(obj, (bytes, bytearray)):
+        return '0x' + bytes(obj).hex()
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError(f'{type(obj).__name__} is not JSON serializable')
+
+
+@functools.cache
+def _orjson_http_provider() -> type:
+    """HTTPProvider subclass that encodes/decodes JSON-RPC payloads with orjson.
+
+    Payloads orjson can't handle (e.g. ints over 64 bits) fall back to web3's
+    stdlib-based serde.
+    """
+    from web3 import HTTPProvider
+
+    class OrjsonHTTPProvider(HTTPProvider):
+        def encode_rpc_request(self, method, params):
+            try:
+                return orjson.dumps(
+                    {'jsonrpc': '2.0', 'method': method, 'params': params or [], 'id': next(self.request_counter)},
+                    default=_rpc_json_default,
+                )
+            except orjson.JSONEncodeError:
+                return super().encode_rpc_request(method, params)
+
+        def decode_rpc_response(self, raw_response):
+            try:
+                return orjson.loads(raw_response)
+            except orjson.JSONDecodeError:
+                return super().decode_rpc_response(raw_response)
+
+    return OrjsonHTTPProvider
 
 
 class Erc8004Adapter:
@@ -24,6 +310,8 @@ class Erc8004Adapter:
 
     - ERC8004_IDENTITY_REGISTRY
     - ERC8004_REPUTATION_REGISTRY
+    - ERC8004_MAX_FEE_GWEI / ERC8004_MAX_PRIORITY_FEE_GWEI (static EIP-1559 fees)
+    - ERC8004_GAS_PRICE_GWEI (fixed gas price; otherwise quote x ERC8004_GAS_PRICE_MULT)
     """
 
     def __init__(self, private_key: Optional[str] = None, rpc_url: Optional[str] = None) -> None:
@@ -32,6 +320,11 @@ class Erc8004Adapter:
         self.identity_registry = os.getenv('ERC8004_IDENTITY_REGISTRY')
         self.reputation_registry = os.getenv('ERC8004_REPUTATION_REGISTRY')
         self.agent_id: Optional[str] = None
+        self.private_key = private_key
+        # Derived accounts keyed by a digest of the private key (pubkey derivation is pure CPU)
+        self._accounts: dict[bytes, Any] = {}
+        # Gas estimates keyed by the exact call: (to, calldata digest, from, value)
+        self._gas_limit_cache: dict[tuple[str, bytes, Optional[str], int], int] = {}
         self._deployment_path = os.getenv('ERC8004_DEPLOYMENT_FILE', 'deployment.json')
 
         if self.enabled:
@@ -39,13 +332,29 @@ class Erc8004Adapter:
         else:
             logger.info('ERC-8004 adapter disabled. Running without on-chain writes.')
 
-        self._w3: Web3 | None = None
-        self._tx_timeout_sec = int(os.getenv('ERC8004_TX_TIMEOUT_SEC', '180'))
+        self._w3: 'Web3 | None' = None
+        self._cfg = _Cfg.from_env()
+        # Chain id is fixed for the RPC endpoint; fetched on first transaction
+        self._chain_id: Optional[int] = None
+        # (monotonic_ts, wei) of the last eth_gasPrice quote
+        self._gas_price_cache: Optional[tuple[float, int]] = None
+        # domain -> (monotonic_ts, agent info); the adapter is shared across threads
+        self._domain_cache: dict[str, tuple[float, Optional[dict[str, Any]]]] = {}
+        # (client_id, server_id) -> (monotonic_ts, FeedbackAuthID hex); same TTL and lock
+        self._feedback_auth_cache: dict[tuple[int, int], tuple[float, str]] = {}
+        self._domain_cache_lock = threading.Lock()
         # Initialize Web3 if RPC is available, even without a private key (read-only ops)
         if self.rpc_url:
             try:
-                rpc_timeout = int(os.getenv('ERC8004_RPC_TIMEOUT_SEC', '20'))
-                self._w3 = Web3(Web3.HTTPProvider(self.rpc_url, request_kwargs={"timeout": rpc_timeout}))
+                from web3 import Web3
+
+                self._w3 = Web3(
+                    _orjson_http_provider()(
+                        self.rpc_url,
+                        request_kwargs={"timeout": self._cfg.rpc_timeout_sec},
+                        session=_rpc_session(),
+                    )
+                )
                 logger.info('ERC-8004 Web3 client initialized (read-only)')
             except Exception as e:
                 logger.warning('ERC-8004: failed to init Web3 client: %s', e)
@@ -54,6 +363,21 @@ class Erc8004Adapter:
         # Lazy-loaded contracts
         self._identity_contract = None
         self._reputation_contract = None
+        self._register_contract = None
+        self._multicall_contract = None
+        # None until probed; False if Multicall3 has no code on this chain
+        self._multicall_available: Optional[bool] = None
+        # Function names each loaded ABI supports, for plain `in` capability checks
+        self._identity_fns: frozenset[str] = frozenset()
+        self._reputation_fns: frozenset[str] = frozenset()
+        # (registry address, selector) for the raw getFeedbackAuthId eth_call, the hot
+        # read on the request path; its fixed bytes32 result is decoded with eth_abi
+        self._get_feedback_auth_id_call: Optional[tuple[str, bytes]] = None
+        # Bound AgentRegistered event and its topic0, set with the identity contract
+        self._agent_registered_event = None
+        self._agent_registered_topic: Optional[bytes] = None
+        # AuthFeedback(agentClientId, agentServerId, feedbackAuthId) topic0, all args indexed
+        self._auth_feedback_topic: Optional[bytes] = None
         # Attempt to hydrate contract addresses from deployment.json if env not set
         if self.enabled and not self.identity_registry:
             self._load_contract_addresses_from_deployment()
@@ -76,6 +400,7 @@ class Erc8004Adapter:
         if not (self._w3 and self.identity_registry):
             logger.info('ERC-8004: ensure_identity skipped (missing Web3 or registry).')
             return
+        from web3.exceptions import TimeExhausted
 
         try:
             # Try IdentityRegistry.newAgent(agentDomain,address)
@@ -87,11 +412,22 @@ class Erc8004Adapter:
                 if not signing_private_key:
                     logger.info('ERC-8004: ensure_identity skipped (no signing key provided 1).')
                     return
-                acct_addr = self._w3.eth.account.from_key(signing_private_key).address
+                account = self._account(signing_private_key)
+                acct_addr = account.address
                 logger.info('find agent by acct_addr: %s', acct_addr)
-                # Pre-check: resolve existing registration by address
+                # Pre-check (resolve existing registration by address), the pending
+                # nonce and the gas price quote are independent reads; fetch them in
+                # one RPC round trip. estimate_gas only runs on the miss path below.
+                reads = [
+                    lambda: identity.functions.resolveByAddress(acct_addr),
+                    lambda: self._w3.eth.get_transaction_count(acct_addr, 'pending'),
+                ]
+                if self._cfg.max_fee_wei is None and self._cfg.gas_price_override_wei is None:
+                    reads.append(lambda: self._w3.eth.gas_price)
+                agent_info, nonce, *quoted = self._batched_reads(*reads)
                 try:
-                    agent_info = identity.functions.resolveByAddress(acct_addr).call()
+                    if isinstance(agent_info, Exception):
+                        raise agent_info
                     if agent_info and agent_info[0] and int(agent_info[0]) > 0:
                         self.agent_id = str(int(agent_info[0]))
                         logger.info('find agent by agent info: %s', agent_info)
@@ -99,49 +435,40 @@ class Erc8004Adapter:
                         return
                 except Exception:
                     pass
+                if isinstance(nonce, Exception):
+                    raise nonce
+                quoted_gas_price = quoted[0] if quoted and not isinstance(quoted[0], Exception) else None
 
                 logger.info("Create New Agent: " + domain + ", " + acct_addr)
                 fn = identity.functions.newAgent(domain, acct_addr)
 
                 # Optional registration fee (default 0.0 if unset)
-                fee_eth = float(os.getenv('ERC8004_REGISTRATION_FEE_ETH', '0.0'))
+                fee_eth = self._cfg.reg_fee_eth
                 value = self._w3.to_wei(fee_eth, 'ether') if fee_eth > 0 else 0
                 # Gas/fees: estimate and apply safety margin + minimums; allow env overrides
-                gas_est = None
-                try:
-                    gas_est = fn.estimate_gas({'from': acct_addr, 'value': value})
-                except Exception:
-                    gas_est = 300000
-                gas_mult = float(os.getenv('ERC8004_GAS_MULT', '1.5'))
-                min_gas = int(os.getenv('ERC8004_MIN_GAS', '500000'))
+                # Calldata is ABI-encoded once and shared by estimate and tx
+                data = _encode_call(fn)
+                gas_est = self._estimate_gas(fn, data, {'from': acct_addr, 'value': value}, 300000)
+                gas_mult = self._cfg.gas_mult
+                min_gas = self._cfg.min_gas or 500000
                 gas_limit = max(int(gas_est * gas_mult), min_gas)
-
-                gas_price = self._w3.eth.gas_price
-                gas_price_mult = float(os.getenv('ERC8004_GAS_PRICE_MULT', '1.2'))
-                try:
-                    override_gwei = os.getenv('ERC8004_GAS_PRICE_MULT')
-                    if override_gwei:
-                        gas_price = self._w3.to_wei(float(override_gwei), 'gwei')
-                    else:
-                        gas_price = int(gas_price * gas_price_mult)
-                except Exception:
-                    pass
-                tx = fn.build_transaction(
+                fees = self._fee_fields(quoted_gas_price)
+                tx = self._contract_tx(
+                    fn,
+                    data,
                     {
                         'from': acct_addr,
-                        'nonce': self._w3.eth.get_transaction_count(acct_addr, 'pending'),
+                        'nonce': nonce,
                         'gas': gas_limit,
-                        'gasPrice': gas_price,
                         'value': value,
-                    }
+                        **fees,
+                    },
                 )
-                logger.info('ERC-8004: newAgent gas_limit=%s gas_price=%s wei (est=%s)', gas_limit, gas_price, gas_est)
-                signed = self._w3.eth.account.sign_transaction(tx, signing_private_key)
+                logger.info('ERC-8004: newAgent gas_limit=%s fees=%s wei (est=%s)', gas_limit, fees, gas_est)
+                signed = account.sign_transaction(tx)
                 tx_hash = self._w3.eth.send_raw_transaction(signed.raw_transaction)
                 try:
-                    receipt = self._w3.eth.wait_for_transaction_receipt(
-                        tx_hash, timeout=self._tx_timeout_sec
-                    )
+                    receipt = self._poll_receipt(tx_hash)
                 except TimeExhausted:
                     # One last attempt to fetch receipt without waiting
                     receipt = self._w3.eth.get_transaction_receipt(tx_hash)
@@ -153,30 +480,30 @@ class Erc8004Adapter:
                 # Try Approach 1: parse AgentRegistered events
                 agent_id_val = None
                 try:
-                    logs = identity.events.AgentRegistered().process_receipt(receipt)
-                    if logs:
-                        agent_id_val = logs[0]['args'].get('agentId')
-                except Exception as e:
+                    agent_id_val = self._agent_id_from_receipt(receipt)
+                except _log_decode_errors() as e:
                     logger.debug('ERC-8004: could not parse AgentRegistered logs: %s', e)
 
                 # Approach 2: resolve by address with small retries
                 if agent_id_val is None:
                     try:
-                        import time as _time
-                        for attempt in range(3):
+                        for attempt, delay in enumerate(_RESOLVE_RETRY_DELAYS):
                             try:
-                                if attempt:
-                                    _time.sleep(0.5)
+                                if delay:
+                                    time.sleep(delay)
                                 agent_info = identity.functions.resolveByAddress(acct_addr).call()
                                 if agent_info and agent_info[0] and int(agent_info[0]) > 0:
                                     agent_id_val = int(agent_info[0])
                                     break
-                            except Exception as e:
-                                if attempt == 2:
+                            except _view_errors() as e:
+                                if attempt == len(_RESOLVE_RETRY_DELAYS) - 1:
                                     logger.debug('ERC-8004: resolveByAddress failed: %s', e)
                     except Exception:
                         pass
 
+                # Forget a cached miss for the domain just registered
+                with self._domain_cache_lock:
+                    self._domain_cache.pop(domain, None)
                 if agent_id_val is not None:
                     self.agent_id = str(agent_id_val)
                     logger.info('ERC-8004: resolved agent id=%s', self.agent_id)
@@ -185,51 +512,37 @@ class Erc8004Adapter:
                     self.agent_id = 'onchain'
                 return
 
-            # Fallback: minimal register(name) if IdentityRegistry ABI is unavailable
-            abi_min = [
-                {
-                    "inputs": [{"internalType": "string", "name": "name", "type": "string"}],
-                    "name": "register",
-                    "outputs": [{"internalType": "uint256", "name": "id", "type": "uint256"}],
-                    "stateMutability": "nonpayable",
-                    "type": "function",
-                }
-            ]
-            contract = self._w3.eth.contract(address=self.identity_registry, abi=abi_min)
+            # Fallback: minimal register(name) if IdentityRegistry ABI is unavailable.
+            # Only reached when the full ABI failed to load, so there is no
+            # AgentRegistered event or resolveByAddress to read the id back with.
+            contract = self._get_register_contract()
             if not signing_private_key:
                 logger.info('ERC-8004: ensure_identity skipped (no signing key provided 2).')
                 return
-            acct_addr = self._w3.eth.account.from_key(signing_private_key).address
+            account = self._account(signing_private_key)
+            acct_addr = account.address
             # Fallback gas config
-            gas_mult = float(os.getenv('ERC8004_GAS_MULT', '1.5'))
-            min_gas = int(os.getenv('ERC8004_MIN_GAS', '500000'))
-            gas_price = self._w3.eth.gas_price
-            gas_price_mult = float(os.getenv('ERC8004_GAS_PRICE_MULT', '1.2'))
-            try:
-                override_gwei = os.getenv('ERC8004_GAS_PRICE_MULT')
-                if override_gwei:
-                    gas_price = self._w3.to_wei(float(override_gwei), 'gwei')
-                else:
-                    gas_price = int(gas_price * gas_price_mult)
-            except Exception:
-                pass
+            gas_mult = self._cfg.gas_mult
+            min_gas = self._cfg.min_gas or 500000
+            fees = self._fee_fields()
             gas_limit = max(int(300000 * gas_mult), min_gas)
 
-            tx = contract.functions.register(agent_name).build_transaction(
+            fn = contract.functions.register(agent_name)
+            tx = self._contract_tx(
+                fn,
+                _encode_call(fn),
                 {
                     'from': acct_addr,
                     'nonce': self._w3.eth.get_transaction_count(acct_addr, 'pending'),
                     'gas': gas_limit,
-                    'gasPrice': gas_price,
-                }
+                    **fees,
+                },
             )
-            logger.info('ERC-8004: register gas_limit=%s gas_price=%s wei', gas_limit, gas_price)
-            signed = self._w3.eth.account.sign_transaction(tx, signing_private_key)
+            logger.info('ERC-8004: register gas_limit=%s fees=%s wei', gas_limit, fees)
+            signed = account.sign_transaction(tx)
             tx_hash = self._w3.eth.send_raw_transaction(signed.raw_transaction)
             try:
-                receipt = self._w3.eth.wait_for_transaction_receipt(
-                    tx_hash, timeout=self._tx_timeout_sec
-                )
+                receipt = self._poll_receipt(tx_hash)
             except TimeExhausted:
                 receipt = self._w3.eth.get_transaction_receipt(tx_hash)
             logger.info('ERC-8004: register tx mined: %s (status=%s)', tx_hash.hex(), receipt.status)
@@ -237,37 +550,213 @@ class Erc8004Adapter:
                 self._log_tx_failure_details(tx_hash, receipt)
                 return
 
-            # Try to extract agent_id even in fallback mode if we can load full ABI
-            agent_id_val = None
-            identity_full = self._get_identity_contract()
-            if identity_full is not None:
-                # Approach 1: parse AgentRegistered events
-                try:
-                    logs = identity_full.events.AgentRegistered().process_receipt(receipt)
-                    if logs:
-                        agent_id_val = logs[0]['args'].get('agentId')
-                except Exception:
-                    pass
-                # Approach 2: resolve by address
-                if agent_id_val is None:
-                    try:
-                        acct_addr = self._w3.eth.account.from_key(self.private_key).address
-                        agent_info = identity_full.functions.resolveByAddress(acct_addr).call()
-                        if agent_info and agent_info[0] and int(agent_info[0]) > 0:
-                            agent_id_val = int(agent_info[0])
-                    except Exception:
-                        pass
-            if agent_id_val is not None:
-                self.agent_id = str(agent_id_val)
-                logger.info('ERC-8004: agent_id set=%s', self.agent_id)
-            else:
-                # Leave marker if we couldn't resolve
-                self.agent_id = 'onchain'
+            # Leave marker; the id can't be resolved without the full ABI
+            self.agent_id = 'onchain'
         except Exception as e:
             logger.warning('ERC-8004: ensure_identity failed: %s', e)
 
     # ---- helpers ----
+    def _batched_reads(self, *reads: Callable[[], Any]) -> list[Any]:
+        """Run independent read calls as a single JSON-RPC batch.
+
+        Each read is a thunk returning a web3 call (a contract function is
+        returned un-called). Falls back to sequential calls if the provider
+        can't batch; failed reads come back as exception instances.
+        """
+        try:
+            with self._w3.batch_requests() as batch:
+                for read in reads:
+                    batch.add(read())
+                return list(batch.execute())
+        except Exception as e:
+            logger.debug('ERC-8004: batch read unavailable, reading sequentially: %s', e)
+        results: list[Any] = []
+        for read in reads:
+            try:
+                value = read()
+                results.append(value.call() if hasattr(value, 'call') else value)
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _multicall(self, *fns: Any) -> list[Any]:
+        """Run contract view calls in one Multicall3 ``tryAggregate`` eth_call.
+
+        Results are decoded with checksummed addresses, like ``fn.call()``
+        would return them; a failed call comes back as an
+        exception instance. Falls back to ``_batched_reads``
+        when Multicall3 isn't deployed on the chain.
+        """
+        if self._multicall_available is None:
+            try:
+                self._multicall_available = bool(self._w3.eth.get_code(MULTICALL3_ADDRESS))
+            except _view_errors():
+                self._multicall_available = False
+        if not self._multicall_available:
+            return self._batched_reads(*(lambda fn=fn: fn for fn in fns))
+        from eth_abi import decode
+        from eth_abi.grammar import parse
+        from eth_utils.abi import get_abi_output_types
+        from web3.exceptions import ContractLogicError
+
+        if self._multicall_contract is None:
+            self._multicall_contract = self._w3.eth.contract(
+                address=MULTICALL3_ADDRESS, abi=list(_MULTICALL3_ABI)
+            )
+        calls = [(fn.address, _encode_call(fn)) for fn in fns]
+        raw = self._multicall_contract.functions.tryAggregate(False, calls).call()
+        results: list[Any] = []
+        for fn, (ok, data) in zip(fns, raw):
+            if not ok:
+                results.append(ContractLogicError(f'{fn.fn_name} reverted'))
+                continue
+            try:
+                output_types = get_abi_output_types(fn.abi)
+                # eth_abi leaves addresses lowercase; fn.call() checksums them
+                values = [
+                    _checksum_outputs(parse(t), v)
+                    for t, v in zip(output_types, decode(output_types, data))
+                ]
+                results.append(values[0] if len(values) == 1 else values)
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def _account(self, private_key: str):
+        """Return the LocalAccount for a key, deriving it only once."""
+        key = hashlib.blake2b(private_key.encode(), digest_size=16).digest()
+        account = self._accounts.get(key)
+        if account is None:
+            account = self._w3.eth.account.from_key(private_key)
+            self._accounts[key] = account
+        return account
+
+    def _estimate_gas(self, fn, data: str, tx_params: dict[str, Any], default: int) -> int:
+        """Estimate gas for a contract call, reusing the estimate for an identical call.
+
+        Only a repeat of the same calldata, sender and value reuses an estimate:
+        gas depends on the arguments (e.g. the domain string passed to newAgent).
+        """
+        key = (
+            fn.address,
+            hashlib.blake2b(str(data).encode(), digest_size=16).digest(),
+            tx_params.get('from'),
+            int(tx_params.get('value') or 0),
+        )
+        cached = self._gas_limit_cache.get(key)
+        if cached is not None:
+            return cached
+        try:
+            gas_est = self._w3.eth.estimate_gas({'to': fn.address, 'data': data, **tx_params})
+        except Exception:
+            return default
+        if len(self._gas_limit_cache) >= GAS_LIMIT_CACHE_MAX:
+            # Oldest first (dicts keep insertion order)
+            del self._gas_limit_cache[next(iter(self._gas_limit_cache))]
+        self._gas_limit_cache[key] = gas_est
+        return gas_est
+
+    def _contract_tx(self, fn, data: str, fields: dict[str, Any]) -> dict[str, Any]:
+        """Assemble a contract-call tx from pre-encoded calldata.
+
+        Unlike ``build_transaction`` this doesn't re-encode the call or fetch
+        the chain id per transaction.
+        """
+        return {'to': fn.address, 'data': data, 'value': 0, 'chainId': self._get_chain_id(), **fields}
+
+    def _get_chain_id(self) -> int:
+        if self._chain_id is None:
+            self._chain_id = self._w3.eth.chain_id
+        return self._chain_id
+
+    def _fee_fields(self, quoted_gas_price: Optional[int] = None) -> dict[str, int]:
+        """Fee fields for a new tx: static EIP-1559 caps if configured, else gasPrice.
+
+        ``quoted_gas_price`` is a gas price already fetched (e.g. in a batch).
+        """
+        if self._cfg.max_fee_wei is not None:
+            return {
+                'maxFeePerGas': self._cfg.max_fee_wei,
+                'maxPriorityFeePerGas': self._cfg.max_priority_fee_wei,
+            }
+        if self._cfg.gas_price_override_wei is not None:
+            return {'gasPrice': self._cfg.gas_price_override_wei}
+        gas_price = self._cached_gas_price(quoted_gas_price)
+        return {'gasPrice': int(gas_price * self._cfg.gas_price_mult)}
+
+    def _cached_gas_price(self, quoted_gas_price: Optional[int] = None) -> int:
+        """Return the node's gas price, re-quoting at most every ERC8004_GAS_PRICE_TTL_SEC."""
+        now = time.monotonic()
+        if quoted_gas_price is not None:
+            self._gas_price_cache = (now, quoted_gas_price)
+        elif self._gas_price_cache is None or now - self._gas_price_cache[0] >= self._cfg.gas_price_ttl_sec:
+            self._gas_price_cache = (now, self._w3.eth.gas_price)
+        return self._gas_price_cache[1]
+
+    def _agent_id_from_receipt(self, receipt) -> Optional[int]:
+        """Decode agentId from the first AgentRegistered log in a receipt.
+
+        Only logs whose topic0 matches the pre-bound event are decoded.
+        """
+        topic = self._agent_registered_topic
+        if topic is None:
+            return None
+        for log in receipt['logs']:
+            topics = log['topics']
+            if topics and bytes(topics[0]) == topic:
+                return self._agent_registered_event.process_log(log)['args'].get('agentId')
+        return None
+
+    def _feedback_auth_id_from_receipt(
+        self, receipt, client_agent_id: int, server_agent_id: int
+    ) -> Optional[str]:
+        """Read the FeedbackAuthID from the receipt's matching AuthFeedback log."""
+        topic = self._auth_feedback_topic
+        if topic is None:
+            return None
+        registry = (self.reputation_registry or '').lower()
+        for log in receipt['logs']:
+            topics = log['topics']
+            if (
+                len(topics) == 4
+                and bytes(topics[0]) == topic
+                and str(log['address']).lower() == registry
+                and int.from_bytes(bytes(topics[1]), 'big') == client_agent_id
+                and int.from_bytes(bytes(topics[2]), 'big') == server_agent_id
+            ):
+                return '0x' + bytes(topics[3]).hex()
+        return None
+
+    def _poll_receipt(self, tx_hash):
+        """Wait for a transaction receipt, backing off between polls.
+
+        Starts at ERC8004_RECEIPT_POLL_SEC (plus up to 0.25s jitter so adapters
+        sharing a node don't poll in lockstep) and doubles up to the chain's
+        block time, so a slow block doesn't cost a steady stream of empty RPC
+        calls. Raises TimeExhausted after ``ERC8004_TX_TIMEOUT_SEC``.
+        """
+        from web3.exceptions import TimeExhausted, TransactionNotFound
+
+        interval = min(self._cfg.receipt_poll_sec + random.uniform(0, 0.25), self._cfg.block_time_sec)
+        deadline = time.monotonic() + self._cfg.tx_timeout_sec
+        while True:
+            try:
+                return self._w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                pass
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeExhausted(
+                    f'Transaction {tx_hash.hex()} not mined after {self._cfg.tx_timeout_sec}s'
+                )
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, self._cfg.block_time_sec)
+
     def _log_tx_failure_details(self, tx_hash, receipt) -> None:
+        """Log a reverted tx and its reason; only called when receipt status != 1."""
+        # The diagnostics cost two extra RPCs; skip them when nothing would be logged
+        if not logger.isEnabledFor(logging.WARNING):
+            return
         try:
             tx = self._w3.eth.get_transaction(tx_hash)
             logger.warning(
@@ -286,19 +775,19 @@ class Erc8004Adapter:
                     block_identifier=getattr(receipt, 'blockNumber', 'latest'),
                 )
             except Exception as e:  # Provider raises here with revert info
-                msg = str(e)
-                # Best-effort slice of revert reason
-                marker = 'execution reverted'
-                reason = msg[msg.find(marker):] if marker in msg else msg
+                reason = _revert_reason(getattr(e, 'data', None))
+                if reason is None:
+                    # Best-effort slice of the provider's message
+                    msg = str(e)
+                    marker = 'execution reverted'
+                    reason = msg[msg.find(marker):] if marker in msg else msg
                 logger.warning('ERC-8004: revert reason: %s', reason)
         except Exception as e:
             logger.debug('ERC-8004: failed to log tx failure details: %s', e)
 
     def _load_contract_addresses_from_deployment(self) -> None:
         try:
-            import json
-            with open(self._deployment_path, 'r') as f:
-                deployment = json.load(f)
+            deployment = _cached_deployment(self._deployment_path)
             contracts = deployment.get('contracts', {})
             self.identity_registry = self.identity_registry or contracts.get('identity_registry')
             self.reputation_registry = self.reputation_registry or contracts.get('reputation_registry')
@@ -307,11 +796,7 @@ class Erc8004Adapter:
 
     def _load_contract_abi(self, contract_name: str) -> Optional[list]:
         try:
-            import json
-            abi_path = f"contracts/out/{contract_name}.sol/{contract_name}.json"
-            with open(abi_path, 'r') as f:
-                artifact = json.load(f)
-                return artifact.get('abi')
+            return _cached_abi(contract_name)
         except Exception as e:
             logger.info('ERC-8004: failed to load ABI for %s: %s', contract_name, e)
             return None
@@ -330,12 +815,29 @@ class Erc8004Adapter:
             return None
         try:
             self._identity_contract = self._w3.eth.contract(address=self.identity_registry, abi=abi)
+            self._identity_fns = _abi_function_names(abi)
+            event_abi = next(
+                (e for e in abi if e.get('type') == 'event' and e.get('name') == 'AgentRegistered'),
+                None,
+            )
+            if event_abi is not None:
+                from eth_utils import event_abi_to_log_topic
+
+                self._agent_registered_event = self._identity_contract.events.AgentRegistered()
+                self._agent_registered_topic = event_abi_to_log_topic(event_abi)
             logger.debug('ERC-8004: found identity contract 2: %s', self._identity_contract)
             return self._identity_contract
         except Exception as e:
             logger.debug('ERC-8004: could not init IdentityRegistry contract: %s', e)
             return None
 
+    def _get_register_contract(self):
+        if self._register_contract is None:
+            self._register_contract = self._w3.eth.contract(
+                address=self.identity_registry, abi=list(_MIN_REGISTER_ABI)
+            )
+        return self._register_contract
+
     def _get_reputation_contract(self):
         logger.debug('ERC-8004: get reputation contract: %s', self.reputation_registry)
         if self._reputation_contract is not None:
@@ -349,6 +851,22 @@ class Erc8004Adapter:
             return None
         try:
             self._reputation_contract = self._w3.eth.contract(address=self.reputation_registry, abi=abi)
+            self._reputation_fns = _abi_function_names(abi)
+            if 'getFeedbackAuthId' in self._reputation_fns:
+                from eth_utils import function_signature_to_4byte_selector
+
+                self._get_feedback_auth_id_call = (
+                    self._reputation_contract.address,
+                    function_signature_to_4byte_selector('getFeedbackAuthId(uint256,uint256)'),
+                )
+            event_abi = next(
+                (e for e in abi if e.get('type') == 'event' and e.get('name') == 'AuthFeedback'),
+                None,
+            )
+            if event_abi is not None:
+                from eth_utils import event_abi_to_log_topic
+
+                self._auth_feedback_topic = event_abi_to_log_topic(event_abi)
             return self._reputation_contract
         except Exception as e:
             logger.debug('ERC-8004: could not init ReputationRegistry contract: %s', e)
@@ -374,6 +892,7 @@ class Erc8004Adapter:
         if not (self._w3 and self.reputation_registry):
             logger.info('ERC-8004: authorize_feedback skipped (missing Web3 or reputation registry).')
             return None
+        from web3.exceptions import TimeExhausted
 
         # Ensure we know our own agent_id (only if caller didn't provide one)
         # Caller must provide the server agent id explicitly
@@ -392,107 +911,64 @@ class Erc8004Adapter:
             if not pk:
                 logger.info('ERC-8004: authorize_feedback skipped (no private key).')
                 return None
-            acct_addr = self._w3.eth.account.from_key(pk).address
+            account = self._account(pk)
+            acct_addr = account.address
             server_agent_id_int = int(server_agent_id)
             client_agent_id_int = int(client_agent_id)
 
             # Try multiple function names for compatibility
-            fn = None
             logger.info('ERC-8004: authorize_feedback client_agent_id: %s, server_agent_id: %s', client_agent_id_int, server_agent_id_int)
-            for fn_name in ('acceptFeedback', 'authorizeFeedback', 'allowFeedback'):
-                try:
-                    fn = getattr(contract.functions, fn_name)(client_agent_id_int, server_agent_id_int)
-                    break
-                except Exception:
-                    fn = None
-            if fn is None:
+            fn_name = next(
+                (n for n in ('acceptFeedback', 'authorizeFeedback', 'allowFeedback') if n in self._reputation_fns),
+                None,
+            )
+            if fn_name is None:
                 logger.info('ERC-8004: Feedback authorization function not found in ABI.')
                 return None
+            fn = contract.functions[fn_name](client_agent_id_int, server_agent_id_int)
 
             # Gas/fees for authorize_feedback: estimate with safety margin and allow env overrides
-            gas_est = None
-            try:
-                gas_est = fn.estimate_gas({'from': acct_addr})
-            except Exception:
-                gas_est = 100000
-            gas_mult = float(os.getenv('ERC8004_GAS_MULT', '1.5'))
-            min_gas = int(os.getenv('ERC8004_MIN_GAS', '200000'))
+            data = _encode_call(fn)
+            gas_est = self._estimate_gas(fn, data, {'from': acct_addr}, 100000)
+            gas_mult = self._cfg.gas_mult
+            min_gas = self._cfg.min_gas or 200000
             gas_limit = max(int(gas_est * gas_mult), min_gas)
+            fees = self._fee_fields()
 
-            gas_price = self._w3.eth.gas_price
-            gas_price_mult = float(os.getenv('ERC8004_GAS_PRICE_MULT', '1.2'))
-            try:
-                override_gwei = os.getenv('ERC8004_GAS_PRICE_MULT')
-                if override_gwei:
-                    gas_price = self._w3.to_wei(float(override_gwei), 'gwei')
-                else:
-                    gas_price = int(gas_price * gas_price_mult)
-            except Exception:
-                pass
-
-            tx = fn.build_transaction(
+            tx = self._contract_tx(
+                fn,
+                data,
                 {
                     'from': acct_addr,
                     'nonce': self._w3.eth.get_transaction_count(acct_addr, 'pending'),
                     'gas': gas_limit,
-                    'gasPrice': gas_price,
-                }
+                    **fees,
+                },
             )
-            logger.info('ERC-8004: authorize gas_limit=%s gas_price=%s wei (est=%s)', gas_limit, gas_price, gas_est)
-            signed = self._w3.eth.account.sign_transaction(tx, pk)
+            logger.info('ERC-8004: authorize gas_limit=%s fees=%s wei (est=%s)', gas_limit, fees, gas_est)
+            signed = account.sign_transaction(tx)
             tx_hash = self._w3.eth.send_raw_transaction(signed.raw_transaction)
             try:
-                receipt = self._w3.eth.wait_for_transaction_receipt(
-                    tx_hash, timeout=self._tx_timeout_sec
-                )
+                receipt = self._poll_receipt(tx_hash)
             except TimeExhausted:
                 receipt = self._w3.eth.get_transaction_receipt(tx_hash)
             logger.info('ERC-8004: authorize feedback tx mined: %s (status=%s)', tx_hash.hex(), getattr(receipt, 'status', None))
             if getattr(receipt, 'status', 0) != 1:
                 self._log_tx_failure_details(tx_hash, receipt)
                 return None
-            # Prefer contract views to confirm and obtain FeedbackAuthID
-            feedback_auth_id = None
-            matched_event = None
-            try:
-                contract = self._get_reputation_contract()
-                logger.info('ERC-8004: contract: %s', contract)
-                logger.info('ERC-8004: has function: %s', hasattr(contract.functions, 'isFeedbackAuthorized') if contract else None)
-                # Block and poll until authorized or timeout
-                import time as _time
-                total_wait_sec = float(os.getenv('ERC8004_VIEW_WAIT_SEC', '8'))
-                poll_ms = float(os.getenv('ERC8004_VIEW_POLL_MS', '300'))
-                deadline = _time.time() + total_wait_sec
-                while feedback_auth_id is None and _time.time() < deadline and contract is not None:
-                    try:
-                        if hasattr(contract.functions, 'isFeedbackAuthorized'):
-                            logger.info('ERC-8004: isFeedbackAuthorized(client=%s, server=%s)', client_agent_id_int, server_agent_id_int)
-                            is_auth, fid = contract.functions.isFeedbackAuthorized(client_agent_id_int, server_agent_id_int).call()
-                            logger.info('ERC-8004: isFeedbackAuthorized(client=%s, server=%s) -> %s, %s', client_agent_id_int, server_agent_id_int, is_auth, fid)
-                            if is_auth and fid is not None:
-                                if hasattr(fid, 'hex'):
-                                    h = fid.hex()
-                                    feedback_auth_id = h if h.startswith('0x') else f'0x{h}'
-                                else:
-                                    feedback_auth_id = str(fid)
-                                matched_event = 'isFeedbackAuthorized(view)'
-                                break
-                        if hasattr(contract.functions, 'getFeedbackAuthId'):
-                            fid2 = contract.functions.getFeedbackAuthId(client_agent_id_int, server_agent_id_int).call()
-                            logger.info('ERC-8004: getFeedbackAuthId(client=%s, server=%s) -> %s', client_agent_id_int, server_agent_id_int, fid2)
-                            if fid2 is not None:
-                                if hasattr(fid2, 'hex'):
-                                    h2 = fid2.hex()
-                                    feedback_auth_id = h2 if h2.startswith('0x') else f'0x{h2}'
-                                else:
-                                    feedback_auth_id = str(fid2)
-                                matched_event = 'getFeedbackAuthId(view)'
-                                break
-                    except Exception as _e:
-                        logger.debug('ERC-8004: view poll error: %s', _e)
-                    _time.sleep(max(0.05, poll_ms / 1000.0))
-            except Exception as e:
-                logger.debug('ERC-8004: view resolution for FeedbackAuthID failed: %s', e)
+            # The AuthFeedback event in the mined receipt carries the FeedbackAuthID
+            # (all args indexed), so the happy path needs no further RPC
+            feedback_auth_id = self._feedback_auth_id_from_receipt(
+                receipt, client_agent_id_int, server_agent_id_int
+            )
+            matched_event = 'AuthFeedback(event)' if feedback_auth_id else None
+            if feedback_auth_id is None:
+                # Fall back to the views (e.g. an ABI without the event):
+                # isFeedbackAuthorized, else getFeedbackAuthId, in one multicall
+                status = self.check_feedback_authorized(client_agent_id_int, server_agent_id_int)
+                if status['feedbackAuthId'] and status['isAuthorized'] is not False:
+                    feedback_auth_id = status['feedbackAuthId']
+                    matched_event = 'isFeedbackAuthorized|getFeedbackAuthId(view)'
 
             result: dict[str, Any] = {
                 'tx_hash': tx_hash.hex(),
@@ -504,7 +980,7 @@ class Erc8004Adapter:
                 identity = self._get_identity_contract()
                 if identity is not None:
                     # Attempt resolveById if available; otherwise ignore
-                    if hasattr(identity.functions, 'resolveById'):
+                    if 'resolveById' in self._identity_fns:
                         info = identity.functions.resolveById(client_agent_id_int).call()
                         # Expected tuple: (id, domain, address)
                         if info and len(info) >= 3:
@@ -529,8 +1005,56 @@ class Erc8004Adapter:
         Tries a direct resolveByDomain/domain-based function on the registry.
         If unavailable, falls back to resolving by address inferred from
         variant-specific private keys (finder/reserve) based on the domain name.
+        Successful lookups are cached for ERC8004_DOMAIN_CACHE_TTL_SEC; misses
+        only for ERC8004_DOMAIN_MISS_TTL_SEC, so a later registration is picked up.
+        """
+        now = time.monotonic()
+        with self._domain_cache_lock:
+            hit = self._domain_cache.get(domain)
+        if hit is not None and now - hit[0] < self._domain_ttl(hit[1]):
+            return hit[1]
+        info = self._resolve_agent_by_domain(domain)
+        with self._domain_cache_lock:
+            self._domain_cache[domain] = (now, info)
+        return info
+
+    def _domain_ttl(self, info: Optional[dict[str, Any]]) -> float:
+        return self._cfg.domain_cache_ttl_sec if info is not None else self._cfg.domain_miss_ttl_sec
+
+    def get_agents_by_domains(self, *domains: str) -> list[Optional[dict[str, Any]]]:
+        """Resolve several domains, reading uncached ones in one Multicall3 batch.
+
+        Domains that resolveByDomain doesn't find go through get_agent_by_domain
+        for its address-based fallback.
         """
+        now = time.monotonic()
+        results: dict[str, Optional[dict[str, Any]]] = {}
+        with self._domain_cache_lock:
+            for domain in domains:
+                hit = self._domain_cache.get(domain)
+                if hit is not None and now - hit[0] < self._domain_ttl(hit[1]):
+                    results[domain] = hit[1]
+        misses = [d for d in dict.fromkeys(domains) if d not in results]
+        identity = self._get_identity_contract() if misses and self._w3 else None
+        if identity is not None and 'resolveByDomain' in self._identity_fns:
+            try:
+                batch = self._multicall(*(identity.functions.resolveByDomain(d) for d in misses))
+            except _view_errors() as e:
+                logger.debug('ERC-8004: batched resolveByDomain failed: %s', e)
+                batch = []
+            for domain, info in zip(misses, batch):
+                if isinstance(info, (list, tuple)) and len(info) >= 3 and info[0] and int(info[0]) > 0:
+                    results[domain] = {'agent_id': int(info[0]), 'domain': info[1], 'address': info[2]}
+            with self._domain_cache_lock:
+                for domain in misses:
+                    if results.get(domain) is not None:
+                        self._domain_cache[domain] = (now, results[domain])
+        for domain in misses:
+            if domain not in results:
+                results[domain] = self.get_agent_by_domain(domain)
+        return [results[d] for d in domains]
 
+    def _resolve_agent_by_domain(self, domain: str) -> Optional[dict[str, Any]]:
         logger.info('************** ERC-8004: get_agent_by_domain: %s', domain)
         if not (self._w3 and self.identity_registry):
             logger.info('************** ERC-8004: not self._w3: %s', self._w3)
@@ -543,9 +1067,10 @@ class Erc8004Adapter:
         # Attempt direct domain resolver methods
         logger.info('************** ERC-8004: attempt direct domain resolver methods: %s', identity)
         for fn_name in ('resolveByDomain', 'getAgentByDomain', 'resolveDomain'):
+            if fn_name not in self._identity_fns:
+                continue
             try:
-                fn = getattr(identity.functions, fn_name)
-                result = fn(domain).call()
+                result = identity.functions[fn_name](domain).call()
                 # Expect (agentId, agentDomain, agentAddress) or similar tuple
                 if isinstance(result, (list, tuple)) and len(result) >= 3:
                     agent_id = int(result[0]) if result[0] is not None else 0
@@ -567,7 +1092,7 @@ class Erc8004Adapter:
             pk = os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT')
         if pk:
             try:
-                addr = self._w3.eth.account.from_key(pk).address
+                addr = self._account(pk).address
                 info = identity.functions.resolveByAddress(addr).call()
                 if info and len(info) >= 3 and int(info[0]) > 0:
                     return {'agent_id': int(info[0]), 'domain': info[1], 'address': info[2]}
@@ -589,29 +1114,32 @@ class Erc8004Adapter:
             if contract is None:
                 logger.info('ERC-8004: check_feedback_authorized skipped (no reputation contract).')
                 return result
+            client_id, server_id = int(client_agent_id), int(server_agent_id)
+            names = [n for n in ('isFeedbackAuthorized', 'getFeedbackAuthId') if n in self._reputation_fns]
+            if not names:
+                return result
+            # Both views are read in one round trip
+            values = dict(
+                zip(names, self._multicall(*(contract.functions[n](client_id, server_id) for n in names)))
+            )
             # Prefer combined view first
-            try:
-                logger.info('ERC-8004: check isFeedbackAuthorized ')
-                if hasattr(contract.functions, 'isFeedbackAuthorized'):
-                    logger.info('ERC-8004: isFeedbackAuthorized ')
-                    is_auth, fid = contract.functions.isFeedbackAuthorized(int(client_agent_id), int(server_agent_id)).call()
-                    logger.info('ERC-8004: isFeedbackAuthorized finished')
-                    logger.info('ERC-8004: isFeedbackAuthorized(client=%s, server=%s) -> %s, %s', client_agent_id, server_agent_id, is_auth, fid)
-                    result['isAuthorized'] = bool(is_auth)
-                    if fid is not None:
-                        result['feedbackAuthId'] = fid.hex() if hasattr(fid, 'hex') else str(fid)
-                        return result
-            except Exception as e:
-                logger.info('ERC-8004: isFeedbackAuthorized view failed: %s', e)
+            combined = values.get('isFeedbackAuthorized')
+            if isinstance(combined, Exception):
+                logger.info('ERC-8004: isFeedbackAuthorized view failed: %s', combined)
+            elif combined is not None:
+                is_auth, fid = combined
+                logger.info('ERC-8004: isFeedbackAuthorized(client=%s, server=%s) -> %s, %s', client_agent_id, server_agent_id, is_auth, fid)
+                result['isAuthorized'] = bool(is_auth)
+                if fid is not None:
+                    result['feedbackAuthId'] = _auth_id_hex(fid)
+                    return result
             # Fallback to id-only view
-            try:
-                if hasattr(contract.functions, 'getFeedbackAuthId'):
-                    fid2 = contract.functions.getFeedbackAuthId(int(client_agent_id), int(server_agent_id)).call()
-                    logger.info('ERC-8004: getFeedbackAuthId(client=%s, server=%s) -> %s', client_agent_id, server_agent_id, fid2)
-                    if fid2 is not None:
-                        result['feedbackAuthId'] = fid2.hex() if hasattr(fid2, 'hex') else str(fid2)
-            except Exception as e:
-                logger.info('ERC-8004: getFeedbackAuthId view failed: %s', e)
+            fid2 = values.get('getFeedbackAuthId')
+            if isinstance(fid2, Exception):
+                logger.info('ERC-8004: getFeedbackAuthId view failed: %s', fid2)
+            elif fid2 is not None:
+                logger.info('ERC-8004: getFeedbackAuthId(client=%s, server=%s) -> %s', client_agent_id, server_agent_id, fid2)
+                result['feedbackAuthId'] = _auth_id_hex(fid2)
         except Exception as e:
             logger.info('ERC-8004: check_feedback_authorized failed: %s', e)
         return result
@@ -619,19 +1147,70 @@ class Erc8004Adapter:
     def get_feedback_auth_id(self, client_agent_id: int, server_agent_id: int) -> Optional[str]:
         """Return only the FeedbackAuthID using the contract view.
 
-        Returns hex string or None.
+        Returns 0x-prefixed hex string or None. A non-zero id is set once per pair, so it is
+        cached like domain lookups; unset (zero) ids are re-read next time.
         """
+        key = (int(client_agent_id), int(server_agent_id))
+        now = time.monotonic()
+        with self._domain_cache_lock:
+            hit = self._feedback_auth_cache.get(key)
+        if hit is not None and now - hit[0] < self._cfg.domain_cache_ttl_sec:
+            return hit[1]
         try:
-            contract = self._get_reputation_contract()
-            if contract is None or not hasattr(contract.functions, 'getFeedbackAuthId'):
+            if self._get_feedback_auth_id_call is None:
+                # Loads the contract (and prepares the call) on first use
+                self._get_reputation_contract()
+            if self._get_feedback_auth_id_call is None:
                 return None
-            fid = contract.functions.getFeedbackAuthId(int(client_agent_id), int(server_agent_id)).call()
+            from eth_abi import decode, encode
+
+            to, selector = self._get_feedback_auth_id_call
+            raw = self._w3.eth.call({'to': to, 'data': selector + encode(['uint256', 'uint256'], key)})
+            fid = decode(['bytes32'], raw)[0]
             logger.info('ERC-8004: getFeedbackAuthId(client=%s, server=%s) -> %s', client_agent_id, server_agent_id, fid)
             if fid is None:
                 return None
-            return fid.hex() if hasattr(fid, 'hex') else str(fid)
+            fid_hex = _auth_id_hex(fid)
+            if isinstance(fid, (bytes, bytearray)) and any(fid):
+                with self._domain_cache_lock:
+                    self._feedback_auth_cache[key] = (now, fid_hex)
+            return fid_hex
         except Exception as e:
             logger.info('ERC-8004: get_feedback_auth_id view failed: %s', e)
             return None
 
+    # ---- async wrappers ----
+    # The web3 client is synchronous; these run the blocking RPC work in a worker
+    # thread so callers on an event loop keep serving other tasks meanwhile.
+    async def aensure_identity(self, *args: Any, **kwargs: Any) -> None:
+        return await asyncio.to_thread(self.ensure_identity, *args, **kwargs)
+
+    async def aget_agent_by_domain(self, domain: str) -> Optional[dict[str, Any]]:
+        return await asyncio.to_thread(self.get_agent_by_domain, domain)
+
+    async def aget_agents_by_domains(self, *domains: str) -> list[Optional[dict[str, Any]]]:
+        return await asyncio.to_thread(self.get_agents_by_domains, *domains)
+
+    async def acheck_feedback_authorized(self, client_agent_id: int, server_agent_id: int) -> dict[str, Any]:
+        return await asyncio.to_thread(self.check_feedback_authorized, client_agent_id, server_agent_id)
+
+    async def aget_feedback_auth_id(self, client_agent_id: int, server_agent_id: int) -> Optional[str]:
+        return await asyncio.to_thread(self.get_feedback_auth_id, client_agent_id, server_agent_id)
 
+
+_default_adapter: Optional[Erc8004Adapter] = None
+_default_adapter_lock = threading.Lock()
+
+
+def get_default_adapter() -> Erc8004Adapter:
+    """Return the process-wide, env-configured adapter.
+
+    Sharing one instance keeps a single Web3 HTTP provider (and its
+    keep-alive connections) and one set of loaded contracts per process.
+    """
+    global _default_adapter
+    if _default_adapter is None:
+        with _default_adapter_lock:
+            if _default_adapter is None:
+                _default_adapter = Erc8004Adapter()
+    return _default_adapter
@@ -1,16 +1,19 @@
 import asyncio
+import io
 import os
 import sys
 import logging
+import time
 import traceback  # Import the traceback module
 
+from collections import OrderedDict
 from collections.abc import AsyncIterator
-from pprint import pformat
 
 import gradio as gr
+import orjson
 import uvicorn
 from fastapi import FastAPI
-from fastapi.responses import RedirectResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse
 from a2a.types import AgentCapabilities, AgentCard, AgentSkill
 
 # Ensure the repository package root is on sys.path so we can import sibling packages
@@ -19,11 +22,9 @@ _repo_root = os.path.dirname(_this_dir)
 if _repo_root not in sys.path:
     sys.path.insert(0, _repo_root)
 
-from common_utils.erc8004_adapter import Erc8004Adapter  # type: ignore
+from common_utils.erc8004_adapter import Erc8004Adapter, get_default_adapter  # type: ignore
 
-from routing_agent import (
-    root_agent as routing_agent,
-)
+from routing_agent import get_root_agent
 
 
 APP_NAME = 'routing_app'
@@ -32,33 +33,79 @@ SESSION_ID = 'default_session'
 
 OPENAI_MODEL = 'gpt-4o-mini'
 
+# Deployment settings, resolved once at startup (routing_agent has loaded .env)
+APP_HOST = os.environ.get('APP_HOST', '0.0.0.0')
+APP_PORT = int(os.environ.get('APP_PORT', '8083'))
+APP_URL = os.environ.get('APP_URL', f'http://{APP_HOST}:{APP_PORT}')
+CHAIN_ID = os.getenv('ERC8004_CHAIN_ID', '11155111')
+ASSISTANT_DOMAIN = os.getenv('ASSISTANT_DOMAIN') or 'assistant.localhost:8083'
+FINDER_DOMAIN = os.getenv('FINDER_DOMAIN') or 'finder.localhost:10002'
+RESERVE_DOMAIN = os.getenv('RESERVE_DOMAIN') or 'reserve.localhost:10002'
+CARD_LOOKUP = os.getenv('ERC8004_CARD_LOOKUP', 'false').lower() == 'true'
+# An unregistered card is served this long before the registry is checked again
+CARD_RETRY_SEC = float(os.getenv('ERC8004_CARD_RETRY_SEC', '30'))
+ASSISTANT_PK = os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT')
+
+# Routing state per browser session, so AgentSession history and task/context
+# ids carry across turns; least recently used sessions are dropped past the cap
+UI_SESSIONS_MAX = 256
+_ui_states: OrderedDict[str, dict] = OrderedDict()
+
+# Library modules no longer configure logging on import
+logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+def _ui_state(request: gr.Request | None, history: list) -> dict:
+    """Return the routing state for this Gradio session; a cleared chat starts over."""
+    key = getattr(request, 'session_hash', None) or SESSION_ID
+    state = _ui_states.get(key) if history else None
+    if state is None:
+        state = _ui_states[key] = {}
+    _ui_states.move_to_end(key)
+    while len(_ui_states) > UI_SESSIONS_MAX:
+        _ui_states.popitem(last=False)
+    return state
+
+
+def _format_json(content) -> str:
+    """Pretty-print tool payloads for the chat UI (non-JSON values via str)."""
+    return orjson.dumps(content, option=orjson.OPT_INDENT_2, default=str).decode()
+
+
 async def get_response_from_agent(
     message: str,
     history: list[gr.ChatMessage],
+    request: gr.Request,
 ) -> AsyncIterator[gr.ChatMessage]:
-    """Get response from host agent via OpenAI-routed tool-calling."""
+    """Get response from host agent via OpenAI-routed tool-calling.
+
+    Tool calls and responses accumulate in one assistant message that is
+    re-yielded as it grows; the answer follows as its own message, updated
+    as it streams in.
+    """
     try:
-        state = {}
+        state = _ui_state(request, history)
+        steps = io.StringIO()
+        steps_msg = gr.ChatMessage(role='assistant', content='')
+        routing_agent = await get_root_agent()
         async for event in routing_agent.handle(message, state):
             etype = event.get('type')
             if etype == 'tool_call':
-                formatted_call = f'```python\n{pformat(event.get("content"), indent=2, width=80)}\n```'
-                yield gr.ChatMessage(
-                    role='assistant',
-                    content=f"🛠️ **Tool Call: {event.get('name')}**\n{formatted_call}",
-                )
+                steps.write(f"🛠️ **Tool Call: {event.get('name')}**\n")
             elif etype == 'tool_response':
-                formatted_response = f'```json\n{pformat(event.get("content"), indent=2, width=80)}\n```'
-                yield gr.ChatMessage(
-                    role='assistant',
-                    content=f"⚡ **Tool Response from {event.get('name')}**\n{formatted_response}",
-                )
-            elif etype == 'final':
-                yield gr.ChatMessage(role='assistant', content=event.get('content', ''))
-                break
+                steps.write(f"⚡ **Tool Response from {event.get('name')}**\n")
+            elif etype in ('partial', 'final'):
+                answer_msg = gr.ChatMessage(role='assistant', content=event.get('content', ''))
+                yield [steps_msg, answer_msg] if steps.tell() else answer_msg
+                if etype == 'final':
+                    break
+                continue
+            else:
+                continue
+            steps.write(f'```json\n{_format_json(event.get("content"))}\n```\n\n')
+            steps_msg.content = steps.getvalue()
+            yield steps_msg
     except Exception as e:
         print(f'Error in get_response_from_agent (Type: {type(e)}): {e}')
         traceback.print_exc()  # This will print the full traceback
@@ -68,20 +115,79 @@ async def get_response_from_agent(
         )
 
 
+def _build_agent_card_dict() -> dict:
+    """Build the assistant's AgentCard JSON, with ERC-8004 registration if enabled."""
+    capabilities = AgentCapabilities(streaming=True)
+    skill = AgentSkill(
+        id='assistant',
+        name='Travel assistant',
+        description='Find and reserve places to stay and check weather',
+        tags=['finder', 'reserve', 'weather'],
+        examples=['Find a place in LA and reserve it, then check weather'],
+    )
+    # Base card
+    card = AgentCard(
+        name='assistant',
+        description='Travel assistant for finding and booking stays and checking weather',
+        url=APP_URL,
+        version='1.0.0',
+        default_input_modes=['text', 'text/plain'],
+        default_output_modes=['text', 'text/plain'],
+        capabilities=capabilities,
+        skills=[skill],
+    )
+    # pydantic-core emits JSON directly; the dict is only needed for augmentation
+    card_dict = orjson.loads(card.model_dump_json(exclude_none=True))
+
+    # Augment with ERC-8004 registration and FeedbackDataURI
+    try:
+        if CARD_LOOKUP:
+            adapter = get_default_adapter()
+            domain = ASSISTANT_DOMAIN
+            info = adapter.get_agent_by_domain(domain)
+            if info and info.get('agent_id') and info.get('address'):
+                caip10 = f"eip155:{CHAIN_ID}:{info['address']}"
+                # Optional ownership signature over domain
+                signature_hex = None
+                private_key = ASSISTANT_PK
+                if private_key:
+                    try:
+                        from eth_account import Account
+                        from eth_account.messages import encode_defunct
+
+                        msg = encode_defunct(text=domain)
+                        signed = Account.sign_message(msg, private_key=private_key)
+                        signature_hex = signed.signature.hex()
+                    except Exception:
+                        signature_hex = None
+                reg = {
+                    'agentId': int(info['agent_id']),
+                    'agentAddress': caip10,
+                }
+                if signature_hex:
+                    reg['signature'] = signature_hex
+                card_dict['registrations'] = [reg]
+        # Feedback export URI (always present)
+        card_dict['FeedbackDataURI'] = f"{APP_URL}/.well-known/feedback.json"
+    except Exception:
+        pass
+
+    return card_dict
+
+
 async def main():
     """Main app: serves AgentCard and mounts Gradio UI under /."""
     # ERC-8004: register Assistant agent identity (optional)
     try:
-        assistant_pk = os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT')
-        adapter = Erc8004Adapter(private_key=assistant_pk)
-        assistant_domain = (
-            os.getenv('ASSISTANT_DOMAIN')
-            or 'assistant.localhost:8083'
-        )
-        adapter.ensure_identity('assistant', agent_domain=assistant_domain, signing_private_key=assistant_pk)
+        adapter = Erc8004Adapter(private_key=ASSISTANT_PK)
+        # Registration RPCs and the receipt wait run in a worker thread
+        await adapter.aensure_identity('assistant', agent_domain=ASSISTANT_DOMAIN, signing_private_key=ASSISTANT_PK)
     except Exception:
         pass
 
+    # Resolve remote agents on the serving loop, not at import time
+    routing_agent = await get_root_agent()
+
     with gr.Blocks(
         theme=gr.themes.Ocean(), title='A2A Host Agent with Logo'
     ) as demo:
@@ -115,77 +221,36 @@ async def main():
             """)
 
     # Build FastAPI app and mount Gradio under a non-root path to avoid '//' redirects
-    app = FastAPI()
+    app = FastAPI(default_response_class=ORJSONResponse)
+
+    # The card is built once; see _build_agent_card_dict
+    app.state.card_dict = _build_agent_card_dict()
+    app.state.card_built_at = time.monotonic()
 
     @app.get('/.well-known/agent-card.json')
     def agent_card():
-        host = os.environ.get('APP_HOST', '0.0.0.0')
-        port = int(os.environ.get('APP_PORT', '8083'))
-        app_url = os.environ.get('APP_URL', f'http://{host}:{port}')
-        capabilities = AgentCapabilities(streaming=True)
-        skill = AgentSkill(
-            id='assistant',
-            name='Travel assistant',
-            description='Find and reserve places to stay and check weather',
-            tags=['finder', 'reserve', 'weather'],
-            examples=['Find a place in LA and reserve it, then check weather'],
-        )
-        # Base card
-        card = AgentCard(
-            name='assistant',
-            description='Travel assistant for finding and booking stays and checking weather',
-            url=app_url,
-            version='1.0.0',
-            default_input_modes=['text', 'text/plain'],
-            default_output_modes=['text', 'text/plain'],
-            capabilities=capabilities,
-            skills=[skill],
-        )
-        card_dict = card.model_dump(exclude_none=True)
-
-        # Augment with ERC-8004 registration and FeedbackDataURI
-        try:
-            if os.getenv('ERC8004_CARD_LOOKUP', 'false').lower() == 'true':
-                adapter = Erc8004Adapter()
-                domain = os.getenv('ASSISTANT_DOMAIN') or 'assistant.localhost:8083'
-                info = adapter.get_agent_by_domain(domain)
-                if info and info.get('agent_id') and info.get('address'):
-                    chain_id = os.getenv('ERC8004_CHAIN_ID', '11155111')
-                    caip10 = f"eip155:{chain_id}:{info['address']}"
-                    # Optional ownership signature over domain
-                    signature_hex = None
-                    private_key = os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT')
-                    if private_key:
-                        try:
-                            from eth_account import Account
-                            from eth_account.messages import encode_defunct
-
-                            msg = encode_defunct(text=domain)
-                            signed = Account.sign_message(msg, private_key=private_key)
-                            signature_hex = signed.signature.hex()
-                        except Exception:
-                            signature_hex = None
-                    reg = {
-                        'agentId': int(info['agent_id']),
-                        'agentAddress': caip10,
-                    }
-                    if signature_hex:
-                        reg['signature'] = signature_hex
-                    card_dict['registrations'] = [reg]
-            # Feedback export URI (always present)
-            card_dict['FeedbackDataURI'] = f"{app_url}/.well-known/feedback.json"
-        except Exception:
-            pass
-
+        card_dict = app.state.card_dict
+        # Registration may land after startup; look it up again (at most every
+        # CARD_RETRY_SEC) until it shows up
+        if (
+            CARD_LOOKUP
+            and 'registrations' not in card_dict
+            and time.monotonic() - app.state.card_built_at >= CARD_RETRY_SEC
+        ):
+            card_dict = app.state.card_dict = _build_agent_card_dict()
+            app.state.card_built_at = time.monotonic()
         return card_dict
 
     @app.get('/.well-known/agent-ids')
     def agent_ids():
-        adapter = Erc8004Adapter()
-        logger.info(f'************ FINDER_DOMAIN: {os.getenv("FINDER_DOMAIN", "finder.localhost:10002")}')
-        finder = adapter.get_agent_by_domain(os.getenv('FINDER_DOMAIN', 'finder.localhost:10002'))
-        reserve = adapter.get_agent_by_domain(os.getenv('RESERVE_DOMAIN', 'reserve.localhost:10002'))
-        assistant = adapter.get_agent_by_domain(os.getenv('ASSISTANT_DOMAIN', 'assistant.localhost:8083'))
+        adapter = get_default_adapter()
+        logger.info(f'************ FINDER_DOMAIN: {FINDER_DOMAIN}')
+        # All three lookups share one Multicall3 read
+        finder, reserve, assistant = adapter.get_agents_by_domains(
+            FINDER_DOMAIN,
+            RESERVE_DOMAIN,
+            ASSISTANT_DOMAIN,
+        )
 
         # Check authorization statuses (assistant as client)
         auths = {}
@@ -206,7 +271,8 @@ async def main():
     def feedback_json():
         # Export in the requested format; gather from routing agent memory
         try:
-            records = routing_agent.feedback_records if hasattr(routing_agent, 'feedback_records') else []
+            # feedback_records is a bounded deque; the JSON encoder wants a list
+            records = list(routing_agent.feedback_records) if hasattr(routing_agent, 'feedback_records') else []
             return records
         except Exception:
             return []
@@ -221,7 +287,10 @@ async def main():
 
     config = uvicorn.Config(app=app, host='0.0.0.0', port=8083, log_level='info')
     server = uvicorn.Server(config)
-    await server.serve()
+    try:
+        await server.serve()
+    finally:
+        await routing_agent.aclose()
 
 
 if __name__ == '__main__':
@@ -23,10 +23,16 @@ TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
 
-    def __init__(self, agent_card: AgentCard, agent_url: str):
+    def __init__(
+        self,
+        agent_card: AgentCard,
+        agent_url: str,
+        httpx_client: httpx.AsyncClient | None = None,
+    ):
         print(f'agent_card: {agent_card}')
         print(f'agent_url: {agent_url}')
-        self._httpx_client = httpx.AsyncClient(timeout=90)
+        # Callers normally pass a shared client so all agents reuse one pool
+        self._httpx_client = httpx_client or httpx.AsyncClient(timeout=90)
         self.agent_client = A2AClient(
             self._httpx_client, agent_card, url=agent_url
         )
@@ -1,15 +1,25 @@
 # pylint: disable=logging-fstring-interpolation
 import asyncio
-import json
+import functools
+import itertools
+import logging
 import os
-import uuid
+import random
+import re
+import secrets
+import time
 
-from typing import Any, AsyncIterator, Dict, List
+from collections import deque
+from collections.abc import Awaitable, Callable, Mapping
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Dict, List, TypeVar
 
 import httpx
+import orjson
 from urllib.parse import urlparse, urlunparse
 
-from a2a.client import A2ACardResolver
+from a2a.client import A2ACardResolver, A2AClientHTTPError
 from a2a.types import (
     AgentCard,
     MessageSendParams,
@@ -19,16 +29,31 @@ from a2a.types import (
     Task,
 )
 from dotenv import load_dotenv
-from openai import OpenAI
+from openai import AsyncOpenAI
 from remote_agent_connection import (
     RemoteAgentConnections,
     TaskUpdateCallback,
 )
-from common_utils.erc8004_adapter import Erc8004Adapter
+from common_utils.erc8004_adapter import get_default_adapter
+
+try:
+    from eth_account import Account  # type: ignore
+except ImportError:  # only used to show the assistant's address
+    Account = None
 
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Streamed answer text is forwarded to the UI in chunks of at least this many chars
+STREAM_YIELD_CHARS = 64
+
+# Session history is append-only until it exceeds RECENT + BUFFER messages,
+# then cut back to about the last RECENT (at a user turn boundary)
+HISTORY_RECENT_MESSAGES = 10
+HISTORY_CACHE_BUFFER = 10
+
 
 SYSTEM_PROMPT = (
     "You are an expert Routing Delegator. Your job is to route user requests "
@@ -37,6 +62,27 @@ SYSTEM_PROMPT = (
     "If the user wants to submit feedback after a reservation, use the leave_feedback tool."
 )
 
+# Common names the LLM uses for the remote agents
+AGENT_NAME_ALIASES: Mapping[str, str] = MappingProxyType({
+    'seller agent': 'Airbnb Agent - Finder',
+    'finder': 'Airbnb Agent - Finder',
+    'search agent': 'Airbnb Agent - Finder',
+    'reserve': 'Airbnb Agent - Reserve',
+    'reservation agent': 'Airbnb Agent - Reserve',
+    'booking agent': 'Airbnb Agent - Reserve',
+    'weather': 'Weather Agent',
+})
+
+
+# Message/context/session ids only need to be unique, not RFC 4122: a random
+# per-process prefix plus a counter avoids a urandom read per id
+_ID_PREFIX = secrets.token_hex(8)
+_id_counter = itertools.count()
+
+
+def _new_id() -> str:
+    return f'{_ID_PREFIX}{next(_id_counter):x}'
+
 
 def create_send_message_payload(
     text: str, task_id: str | None = None, context_id: str | None = None
@@ -46,7 +92,7 @@ def create_send_message_payload(
         'message': {
             'role': 'user',
             'parts': [{'type': 'text', 'text': text}],
-            'messageId': uuid.uuid4().hex,
+            'messageId': _new_id(),
         },
     }
 
@@ -58,6 +104,224 @@ def create_send_message_payload(
     return payload
 
 
+# Airbnb agent variants served under /<variant> on the shared server
+_VARIANT_RE = re.compile(r'(finder|reserve)')
+
+
+@functools.lru_cache(maxsize=256)
+def _fallback_card_address(address: str) -> str | None:
+    """Rewrite an agent address that failed to resolve, or None if no rewrite applies.
+
+    ``*.localhost`` subdomains are fetched via ``localhost``, and the variant
+    path is added when the hostname implies it.
+    """
+    parsed = urlparse(address if '://' in address else f'http://{address}')
+    hostname = parsed.hostname or ''
+    port = parsed.port
+    scheme = parsed.scheme or 'http'
+    path = parsed.path or '/'
+
+    new_host = 'localhost' if hostname.endswith('.localhost') else hostname
+    new_path = path
+    m = _VARIANT_RE.search(hostname) or _VARIANT_RE.search(path)
+    if m and not path.startswith(f'/{m.group(1)}'):
+        new_path = f'/{m.group(1)}'
+
+    if new_host == hostname and new_path == path:
+        return None
+    netloc = f"{new_host}:{port}" if port else new_host
+    return urlunparse((scheme, netloc, new_path, '', '', ''))
+
+
+_T = TypeVar('_T')
+
+_TRANSIENT_HTTP_ERRORS = (
+    httpx.ConnectError,
+    httpx.ReadTimeout,
+    httpx.RemoteProtocolError,
+)
+
+
+def _is_transient(exc: Exception) -> bool:
+    """Network faults worth retrying (the card resolver reports them as 503)."""
+    if isinstance(exc, _TRANSIENT_HTTP_ERRORS):
+        return True
+    return isinstance(exc, A2AClientHTTPError) and exc.status_code == 503
+
+
+async def _retry(
+    coro_factory: Callable[[], Awaitable[_T]],
+    max_retries: int = 3,
+    base: float = 1.0,
+    cap: float = 30.0,
+) -> _T:
+    """Await ``coro_factory()``, retrying transient failures with jittered backoff."""
+    for attempt in itertools.count():
+        try:
+            return await coro_factory()
+        except Exception as e:
+            if attempt >= max_retries or not _is_transient(e):
+                raise
+            delay = min(cap, base * (2**attempt)) * (0.5 + random.random() * 0.5)
+            logger.debug('Transient error (%s), retrying in %.2fs', e, delay)
+            await asyncio.sleep(delay)
+
+
+async def _resolve_agent_card(
+    client: httpx.AsyncClient, address: str
+) -> tuple[AgentCard, str]:
+    """Fetch an agent card, falling back to the rewritten address on failure.
+
+    Both fetches retry transient errors. Returns the card and the URL it was
+    actually fetched from.
+    """
+    try:
+        card = await _retry(lambda: A2ACardResolver(client, address).get_agent_card())
+        return card, address
+    except Exception:
+        fallback_address = _fallback_card_address(address)
+        if fallback_address is None:
+            raise
+    card = await _retry(lambda: A2ACardResolver(client, fallback_address).get_agent_card())
+    return card, fallback_address
+
+
+@dataclass(frozen=True, slots=True)
+class EnvConfig:
+    """Environment settings used per turn, read once when the agent is built.
+
+    To override a value, use ``agent.env = dataclasses.replace(agent.env, ...)``.
+    """
+
+    openai_api_key: str | None
+    openai_model: str
+    chain_id: str
+    finder_domain: str
+    reserve_domain: str
+    assistant_domain: str
+    pk_assistant: str | None
+    feedback_payment_tx: str | None
+    # 'anthropic' marks the system prefix and tool schema with cache_control
+    llm_backend: str
+
+    @classmethod
+    def from_env(cls) -> 'EnvConfig':
+        return cls(
+            openai_api_key=os.getenv('OPENAI_API_KEY'),
+            openai_model=os.getenv('OPENAI_MODEL', 'gpt-4o-mini'),
+            chain_id=os.getenv('ERC8004_CHAIN_ID', '11155111'),
+            finder_domain=os.getenv('FINDER_DOMAIN', 'finder.localhost:10002'),
+            reserve_domain=os.getenv('RESERVE_DOMAIN', 'reserve.localhost:10002'),
+            assistant_domain=os.getenv('ASSISTANT_DOMAIN') or 'assistant.localhost:8083',
+            pk_assistant=os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT'),
+            feedback_payment_tx=os.getenv('FEEDBACK_PAYMENT_TX'),
+            llm_backend=os.getenv('LLM_BACKEND', 'openai').lower(),
+        )
+
+
+def _address_from_key(private_key: str | None) -> str | None:
+    """Derive the account address for a private key, or None if unavailable."""
+    if not private_key or Account is None:
+        return None
+    try:
+        return Account.from_key(private_key).address
+    except Exception:
+        return None
+
+
+@dataclass(slots=True)
+class AgentSession:
+    """Per-conversation routing state, kept in ``state['_session']``."""
+
+    session_id: str = field(default_factory=_new_id)
+    active_agent: str | None = None
+    # Remote task/context ids per agent, so an id is never sent to another agent
+    task_ids: dict[str, str] = field(default_factory=dict)
+    context_ids: dict[str, str] = field(default_factory=dict)
+    # Earlier turns' user/assistant/tool messages, replayed after the system prefix
+    history: list[dict[str, Any]] = field(default_factory=list)
+
+    def trim_history(self) -> None:
+        """Drop old turns once the window overflows; a no-op otherwise."""
+        history = self.history
+        if len(history) <= HISTORY_RECENT_MESSAGES + HISTORY_CACHE_BUFFER:
+            return
+        start = len(history) - HISTORY_RECENT_MESSAGES
+        cut = next(
+            (i for i in range(start, len(history)) if history[i]['role'] == 'user'),
+            len(history),
+        )
+        del history[:cut]
+
+
+def _build_tools_schema(allowed_agents: list[str]) -> List[Dict[str, Any]]:
+    """OpenAI tool definitions, with agent-name enums limited to the loaded agents."""
+    return [
+        {
+            'type': 'function',
+            'function': {
+                'name': 'send_message',
+                'description': 'Send a task to a remote agent and obtain its response.',
+                'parameters': {
+                    'type': 'object',
+                    'properties': {
+                        'agent_name': {
+                            'type': 'string',
+                            'description': 'Name of the remote agent',
+                            'enum': allowed_agents,
+                        },
+                        'task': {'type': 'string', 'description': 'Task to send to the agent'},
+                    },
+                    'required': ['agent_name', 'task'],
+                },
+            },
+        },
+        {
+            'type': 'function',
+            'function': {
+                'name': 'leave_feedback',
+                'description': 'Leave feedback for an agent via ERC-8004 reputation registry (rating 1-5).',
+                'parameters': {
+                    'type': 'object',
+                    'properties': {
+                        'agent_name': {
+                            'type': 'string',
+                            'description': 'Name of the agent to leave feedback for',
+                            'enum': allowed_agents,
+                        },
+                        'rating': {'type': 'integer', 'minimum': 1, 'maximum': 5},
+                        'comment': {'type': 'string'},
+                    },
+                    'required': ['agent_name', 'rating', 'comment'],
+                },
+            },
+        },
+        {
+            'type': 'function',
+            'function': {
+                'name': 'authorize_feedback',
+                'description': 'Authorize a client (assistant) agent to provide feedback for a target agent.',
+                'parameters': {
+                    'type': 'object',
+                    'properties': {
+                        'client_agent_name': {
+                            'type': 'string',
+                            'description': 'Name of the client agent (Assistant) providing feedback',
+                            'enum': allowed_agents + ['assistant'],
+                        },
+                        'target_agent_name': {
+                            'type': 'string',
+                            'description': 'Name of the target agent (Finder/Reserve) to authorize feedback for',
+                            'enum': allowed_agents,
+                        },
+                    },
+                    'required': ['client_agent_name', 'target_agent_name'],
+                },
+            },
+        },
+    ]
+
+
 class RoutingAgent:
     """The Routing agent.
 
@@ -70,14 +334,40 @@ class RoutingAgent:
         task_callback: TaskUpdateCallback | None = None,
     ):
         self.task_callback = task_callback
+        self.env = EnvConfig.from_env()
+        # Key recovery is not free; derive the assistant address once
+        self._assistant_address = _address_from_key(self.env.pk_assistant)
+        # The assistant's registry entry, once it has resolved (see _lookup_with_assistant)
+        self._assistant_info: dict[str, Any] | None = None
         self.remote_agent_connections: dict[str, RemoteAgentConnections] = {}
         self.cards: dict[str, AgentCard] = {}
         self.agents: str = ''
         self.remote_agent_addresses: list[str] = []
-        self.feedback_records: list[dict[str, Any]] = []
+        # Newest FEEDBACK_MAX records are kept; older ones drop off the front
+        self.feedback_records: deque[dict[str, Any]] = deque(
+            maxlen=int(os.getenv('FEEDBACK_MAX', '10000'))
+        )
         self.authorized_feedback_agent_ids: set[int] = set()
         self.authorized_feedback_agent_addr_by_id: dict[int, str] = {}
         self.authorized_feedback_auth_id_by_target_id: dict[int, str] = {}
+        # One keep-alive pool for card resolution and every remote agent's
+        # send_message traffic; created on first use (see _get_http)
+        self._http: httpx.AsyncClient | None = None
+        # address -> (monotonic_ts, card, fetch url); refreshed in the background
+        self._card_cache: dict[str, tuple[float, AgentCard, str]] = {}
+        self._card_ttl = float(os.getenv('AGENT_CARD_TTL', '900'))
+        self._card_refresh_task: asyncio.Task | None = None
+        self._aclient: AsyncOpenAI | None = None
+        # Per-turn constants, rebuilt whenever the set of agent cards changes
+        self._remote_agent_info: list[dict[str, Any]] | None = None
+        # Leading system message; kept byte-identical across turns so the
+        # provider's prompt cache covers it and the tool schema
+        self._system_message: Dict[str, Any] = {}
+        self._allowed_agents: list[str] = []
+        self._tools_schema: List[Dict[str, Any]] = []
+        self._set_prompt_prefix(SYSTEM_PROMPT, [])
+        # Lowercased agent name -> canonical name, rebuilt when cards load
+        self._name_lc: dict[str, str] = {}
 
     async def _async_init_components(
         self, remote_agent_addresses: list[str]
@@ -85,118 +375,7 @@ class RoutingAgent:
         """Asynchronous part of initialization."""
         # Persist the configured addresses for lazy refresh
         self.remote_agent_addresses = list(remote_agent_addresses)
-        # Use a single httpx.AsyncClient for all card resolutions for efficiency
-        async with httpx.AsyncClient(timeout=30) as client:
-            for address in remote_agent_addresses:
-                card_resolver = A2ACardResolver(
-                    client, address
-                )  # Constructor is sync
-                try:
-                    card = (
-                        await card_resolver.get_agent_card()
-                    )  # get_agent_card is async
-
-                    # Prefer to show the original address to the UI, but keep the
-                    # actual connection URL as the resolved/fetchable address.
-                    try:
-                        card.url = address
-                    except Exception:
-                        pass
-
-                    remote_connection = RemoteAgentConnections(
-                        agent_card=card, agent_url=address
-                    )
-                    self.remote_agent_connections[card.name] = remote_connection
-                    self.cards[card.name] = card
-                except httpx.ConnectError as e:
-                    # Retry strategy for .localhost subdomains and missing variant path
-                    try:
-                        parsed = urlparse(address if '://' in address else f'http://{address}')
-                        hostname = parsed.hostname or ''
-                        port = parsed.port
-                        scheme = parsed.scheme or 'http'
-                        path = parsed.path or '/'
-
-                        new_host = hostname
-                        new_path = path
-                        # If subdomain like finder.localhost, use localhost for fetching
-                        if hostname.endswith('.localhost'):
-                            new_host = 'localhost'
-                        # Ensure path contains variant when implied by hostname
-                        if (('finder' in hostname or 'finder' in path) and not path.startswith('/finder')):
-                            new_path = '/finder'
-                        if (('reserve' in hostname or 'reserve' in path) and not path.startswith('/reserve')):
-                            new_path = '/reserve'
-
-                        if new_host != hostname or new_path != path:
-                            netloc = f"{new_host}:{port}" if port else new_host
-                            fallback_address = urlunparse((scheme, netloc, new_path, '', '', ''))
-                            # Try fetch with fallback
-                            card = await A2ACardResolver(client, fallback_address).get_agent_card()
-                            try:
-                                # Present original nice address to UI if possible
-                                card.url = address
-                            except Exception:
-                                pass
-                            remote_connection = RemoteAgentConnections(
-                                agent_card=card, agent_url=fallback_address
-                            )
-                            self.remote_agent_connections[card.name] = remote_connection
-                            self.cards[card.name] = card
-                            continue
-                        # If no rewrite possible, surface original error
-                        print(
-                            f'ERROR: Failed to get agent card from {address}: {e}'
-                        )
-                    except Exception as e2:
-                        print(
-                            f'ERROR: Failed to initialize connection for {address} with fallback: {e2}'
-                        )
-                except Exception as e:  # Catch other potential errors
-                    # Attempt same fallback rewrite strategy for generic errors
-                    try:
-                        parsed = urlparse(address if '://' in address else f'http://{address}')
-                        hostname = parsed.hostname or ''
-                        port = parsed.port
-                        scheme = parsed.scheme or 'http'
-                        path = parsed.path or '/'
-
-                        new_host = hostname
-                        new_path = path
-                        if hostname.endswith('.localhost'):
-                            new_host = 'localhost'
-                        if (('finder' in hostname or 'finder' in path) and not path.startswith('/finder')):
-                            new_path = '/finder'
-                        if (('reserve' in hostname or 'reserve' in path) and not path.startswith('/reserve')):
-                            new_path = '/reserve'
-
-                        if new_host != hostname or new_path != path:
-                            netloc = f"{new_host}:{port}" if port else new_host
-                            fallback_address = urlunparse((scheme, netloc, new_path, '', '', ''))
-                            card = await A2ACardResolver(client, fallback_address).get_agent_card()
-                            try:
-                                card.url = address
-                            except Exception:
-                                pass
-                            remote_connection = RemoteAgentConnections(
-                                agent_card=card, agent_url=fallback_address
-                            )
-                            self.remote_agent_connections[card.name] = remote_connection
-                            self.cards[card.name] = card
-                            continue
-                        print(
-                            f'ERROR: Failed to initialize connection for {address}: {e}'
-                        )
-                    except Exception as e2:
-                        print(
-                            f'ERROR: Failed to initialize connection for {address} with fallback: {e2}'
-                    )
-
-        # Populate self.agents using the logic from original __init__ (via list_remote_agents)
-        agent_info = []
-        for agent_detail_dict in self.list_remote_agents():
-            agent_info.append(json.dumps(agent_detail_dict))
-        self.agents = '\n'.join(agent_info)
+        await self._load_cards(self._get_http(), remote_agent_addresses)
 
     async def _refresh_cards_if_needed(self) -> None:
         """Attempt to refresh remote agent cards if none are loaded."""
@@ -204,53 +383,61 @@ class RoutingAgent:
             return
         if not self.remote_agent_addresses:
             return
-        async with httpx.AsyncClient(timeout=30) as client:
-            for address in self.remote_agent_addresses:
-                try:
-                    card = await A2ACardResolver(client, address).get_agent_card()
-                    try:
-                        card.url = address
-                    except Exception:
-                        pass
-                    self.remote_agent_connections[card.name] = RemoteAgentConnections(
-                        agent_card=card, agent_url=address
-                    )
-                    self.cards[card.name] = card
-                    continue
-                except Exception:
-                    pass
-                # Retry with .localhost rewrite if applicable
-                try:
-                    parsed = urlparse(address if '://' in address else f'http://{address}')
-                    hostname = parsed.hostname or ''
-                    port = parsed.port
-                    scheme = parsed.scheme or 'http'
-                    path = parsed.path or '/'
-                    new_host = 'localhost' if hostname.endswith('.localhost') else hostname
-                    new_path = path
-                    if (('finder' in hostname or 'finder' in path) and not path.startswith('/finder')):
-                        new_path = '/finder'
-                    if (('reserve' in hostname or 'reserve' in path) and not path.startswith('/reserve')):
-                        new_path = '/reserve'
-                    if new_host != hostname or new_path != path:
-                        netloc = f"{new_host}:{port}" if port else new_host
-                        fallback_address = urlunparse((scheme, netloc, new_path, '', '', ''))
-                        card = await A2ACardResolver(client, fallback_address).get_agent_card()
-                        try:
-                            card.url = address
-                        except Exception:
-                            pass
-                        self.remote_agent_connections[card.name] = RemoteAgentConnections(
-                            agent_card=card, agent_url=fallback_address
-                        )
-                        self.cards[card.name] = card
-                except Exception:
-                    continue
-        # Rebuild agents string
-        agent_info = []
-        for agent_detail_dict in self.list_remote_agents():
-            agent_info.append(json.dumps(agent_detail_dict))
-        self.agents = '\n'.join(agent_info)
+        await self._load_cards(self._get_http(), self.remote_agent_addresses)
+
+    async def _load_cards(
+        self, client: httpx.AsyncClient, addresses: list[str], force: bool = False
+    ) -> None:
+        """Resolve all agent cards concurrently and register their connections."""
+        results = await asyncio.gather(
+            *(self._resolve_card_cached(client, address, force) for address in addresses),
+            return_exceptions=True,
+        )
+        for address, result in zip(addresses, results):
+            if isinstance(result, BaseException):
+                print(
+                    f'ERROR: Failed to initialize connection for {address}: {result}'
+                )
+                continue
+            card, agent_url = result
+            # Prefer to show the original address to the UI, but keep the
+            # actual connection URL as the resolved/fetchable address.
+            try:
+                card.url = address
+            except Exception:
+                pass
+            self.remote_agent_connections[card.name] = RemoteAgentConnections(
+                agent_card=card, agent_url=agent_url, httpx_client=client
+            )
+            self.cards[card.name] = card
+
+        self._rebuild_prompt_and_tools()
+
+    async def _resolve_card_cached(
+        self, client: httpx.AsyncClient, address: str, force: bool = False
+    ) -> tuple[AgentCard, str]:
+        """Resolve a card through the TTL cache; a stale entry is served if the fetch fails."""
+        hit = self._card_cache.get(address)
+        if hit is not None and not force and time.monotonic() - hit[0] < self._card_ttl:
+            return hit[1], hit[2]
+        try:
+            card, agent_url = await _resolve_agent_card(client, address)
+        except Exception as e:
+            if hit is None:
+                raise
+            logger.warning('Agent card refresh for %s failed, keeping cached card: %s', address, e)
+            return hit[1], hit[2]
+        self._card_cache[address] = (time.monotonic(), card, agent_url)
+        return card, agent_url
+
+    async def _refresh_cards_periodically(self) -> None:
+        """Re-resolve every configured agent card each half TTL."""
+        while True:
+            await asyncio.sleep(self._card_ttl / 2)
+            try:
+                await self._load_cards(self._get_http(), self.remote_agent_addresses, force=True)
+            except Exception as e:
+                logger.warning('Periodic agent card refresh failed: %s', e)
 
     @classmethod
     async def create(
@@ -261,43 +448,92 @@ class RoutingAgent:
         """Create and asynchronously initialize an instance of the RoutingAgent."""
         instance = cls(task_callback)
         await instance._async_init_components(remote_agent_addresses)
+        instance._card_refresh_task = asyncio.create_task(
+            instance._refresh_cards_periodically()
+        )
         return instance
 
-    def _openai_client(self) -> OpenAI:
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError('OPENAI_API_KEY environment variable is not set')
-        return OpenAI(api_key=api_key)
-
-    def _build_system_prompt(self, state: Dict[str, Any]) -> str:
+    def _get_http(self) -> httpx.AsyncClient:
+        """Return the shared HTTP client, creating it on the running loop."""
+        if self._http is None:
+            # Remote agents run LLM turns, so reads get the long timeout
+            self._http = httpx.AsyncClient(
+                timeout=httpx.Timeout(90, connect=10),
+                limits=httpx.Limits(
+                    max_keepalive_connections=32,
+                    max_connections=128,
+                    keepalive_expiry=30,
+                ),
+            )
+        return self._http
+
+    async def aclose(self) -> None:
+        """Stop card refresh and close the shared HTTP pool and OpenAI client."""
+        if self._card_refresh_task is not None:
+            self._card_refresh_task.cancel()
+        if self._http is not None:
+            await self._http.aclose()
+        if self._aclient is not None:
+            await self._aclient.close()
+
+    def _openai_client(self) -> AsyncOpenAI:
+        # Created on first use so it binds to the serving loop, then reused
+        if self._aclient is None:
+            if not self.env.openai_api_key:
+                raise ValueError('OPENAI_API_KEY environment variable is not set')
+            self._aclient = AsyncOpenAI(api_key=self.env.openai_api_key)
+        return self._aclient
+
+    def _active_agent_message(self, state: Dict[str, Any]) -> Dict[str, str]:
+        """Short per-turn system message, placed after the replayed history."""
         current_active = self._get_active_agent_name(state)
+        return {'role': 'system', 'content': f'Currently Active Seller Agent: {current_active}'}
+
+    def _set_prompt_prefix(self, system_prompt: str, agent_names: list[str]) -> None:
+        """Set the leading system message and tool schema sent on every request.
+
+        With LLM_BACKEND=anthropic both carry an ephemeral cache_control marker so
+        the backend caches the prefix; OpenAI caches prefixes without markers.
+        """
+        tools = _build_tools_schema(agent_names)
+        if self.env.llm_backend == 'anthropic':
+            cache_control = {'type': 'ephemeral'}
+            content: str | list[dict[str, Any]] = [
+                {'type': 'text', 'text': system_prompt, 'cache_control': cache_control}
+            ]
+            tools[-1] = {**tools[-1], 'cache_control': cache_control}
+        else:
+            content = system_prompt
+        self._system_message = {'role': 'system', 'content': content}
+        self._tools_schema = tools
+
+    def _rebuild_prompt_and_tools(self) -> None:
+        """Recompute the agent-dependent prompt prefix and tool schema after cards load."""
+        self._remote_agent_info = None
+        remote_agents = self.list_remote_agents()
+        self.agents = orjson.dumps(remote_agents).decode()
         # Present exact agent names to minimize LLM drift
         available_names = list(self.remote_agent_connections.keys())
-        # Build a fresh summary of available agents from current cards
-        available_agents_summary = [
-            {'name': c.name, 'description': c.description}
-            for c in self.cards.values()
-        ]
-        return (
+        self._set_prompt_prefix(
             f"{SYSTEM_PROMPT}\n\n"
-            f"Available Agents: {available_agents_summary}\n"
-            f"Agent Names (use exactly one of these in agent_name): {available_names}\n"
-            f"Currently Active Seller Agent: {current_active}"
+            f"Available Agents: {remote_agents}\n"
+            f"Agent Names (use exactly one of these in agent_name): {available_names}",
+            available_names,
         )
+        self._allowed_agents = available_names
+        self._name_lc = {n.lower(): n for n in available_names}
 
     def _get_active_agent_name(self, state: Dict[str, Any]) -> str:
-        if (
-            'session_id' in state
-            and state.get('session_active')
-            and 'active_agent' in state
-        ):
-            return f"{state['active_agent']}"
+        session = state.get('_session')
+        if session is not None and session.active_agent is not None:
+            return session.active_agent
         return 'None'
 
-    def ensure_session_state(self, state: Dict[str, Any]) -> None:
-        if not state.get('session_active'):
-            state['session_id'] = state.get('session_id') or str(uuid.uuid4())
-            state['session_active'] = True
+    def ensure_session_state(self, state: Dict[str, Any]) -> AgentSession:
+        session = state.get('_session')
+        if session is None:
+            session = state['_session'] = AgentSession()
+        return session
 
     def _resolve_agent_name(self, requested: str) -> str | None:
         """Resolve a requested agent name to a known remote agent name.
@@ -306,46 +542,53 @@ class RoutingAgent:
         """
         if not requested:
             return None
-        names = list(self.remote_agent_connections.keys())
         # Exact
         if requested in self.remote_agent_connections:
             return requested
         # Case-insensitive exact
-        for n in names:
-            if n.lower() == requested.lower():
-                return n
+        name = self._name_lc.get(requested.lower())
+        if name is not None:
+            return name
         # Simple aliases
-        alias_map = {
-            'seller agent': 'Airbnb Agent - Finder',
-            'finder': 'Airbnb Agent - Finder',
-            'search agent': 'Airbnb Agent - Finder',
-            'reserve': 'Airbnb Agent - Reserve',
-            'reservation agent': 'Airbnb Agent - Reserve',
-            'booking agent': 'Airbnb Agent - Reserve',
-            'weather': 'Weather Agent',
-        }
         normalized = requested.lower().strip()
-        if normalized in alias_map and alias_map[normalized] in self.remote_agent_connections:
-            return alias_map[normalized]
+        alias = AGENT_NAME_ALIASES.get(normalized)
+        if alias in self.remote_agent_connections:
+            return alias
         # Substring heuristic
-        for n in names:
-            if normalized in n.lower() or n.lower() in normalized:
+        for lc, n in self._name_lc.items():
+            if normalized in lc or lc in normalized:
                 return n
         return None
 
     def list_remote_agents(self):
         """List the available remote agents you can use to delegate the task."""
-        if not self.cards:
-            return []
-
-        remote_agent_info = []
-        for card in self.cards.values():
-            print(f'Found agent card: {card.model_dump(exclude_none=True)}')
-            print('=' * 100)
-            remote_agent_info.append(
-                {'name': card.name, 'description': card.description}
-            )
-        return remote_agent_info
+        if self._remote_agent_info is None:
+            remote_agent_info = []
+            for card in self.cards.values():
+                logger.debug('Found agent card: %s', card)
+                remote_agent_info.append(
+                    {'name': card.name, 'description': card.description}
+                )
+            self._remote_agent_info = remote_agent_info
+        return self._remote_agent_info
+
+    async def _lookup_with_assistant(
+        self, *domains: str
+    ) -> list[dict[str, Any] | None]:
+        """Resolve registry entries for domains, then the assistant's own entry.
+
+        The assistant's entry is remembered once it has an agent id, so later
+        calls only go to the registry for the other domains; otherwise it
+        rides in the same batched read.
+        """
+        adapter = get_default_adapter()
+        if self._assistant_info is not None:
+            infos = await adapter.aget_agents_by_domains(*domains) if domains else []
+            return [*infos, self._assistant_info]
+        infos = await adapter.aget_agents_by_domains(*domains, self.env.assistant_domain)
+        if infos[-1] and infos[-1].get('agent_id'):
+            self._assistant_info = infos[-1]
+        return infos
 
     async def _authorize_feedback(self, client_agent_name: str, target_agent_name: str) -> dict[str, Any]:
         """Call acceptFeedback(client_agent_id, target_agent_id) in reputation registry.
@@ -355,18 +598,15 @@ class RoutingAgent:
         # Resolve names to registry ids
         target_resolved = self._resolve_agent_name(target_agent_name) or ''
         is_reserve = 'reserve' in target_resolved.lower()
-        target_domain_env = 'RESERVE_DOMAIN' if is_reserve else 'FINDER_DOMAIN'
-        target_domain = os.getenv(target_domain_env, 'reserve.localhost:10002' if is_reserve else 'finder.localhost:10002')
+        target_domain = self.env.reserve_domain if is_reserve else self.env.finder_domain
 
-        adapter = Erc8004Adapter()
-        target_info = adapter.get_agent_by_domain(target_domain)
+        # Client (assistant) id: assume assistant domain is configured
+        adapter = get_default_adapter()
+        target_info, client_info = await self._lookup_with_assistant(target_domain)
         if not target_info or not target_info.get('agent_id'):
             return {'status': 'error', 'message': f'Could not resolve target agent {target_agent_name}'}
         target_id = int(target_info['agent_id'])
 
-        # Client (assistant) id: assume assistant domain is configured
-        client_domain = os.getenv('ASSISTANT_DOMAIN') or 'assistant.localhost:8083'
-        client_info = adapter.get_agent_by_domain(client_domain)
         if not client_info or not client_info.get('agent_id'):
             return {'status': 'error', 'message': f'Could not resolve client agent {client_agent_name}'}
         client_id = int(client_info['agent_id'])
@@ -374,8 +614,7 @@ class RoutingAgent:
         # Execute authorization tx signed by the SERVER (Finder/Reserve) key via adapter
         # No user-involved steps; adapter handles acceptFeedback and returns FeedbackAuthID
         # Sign with the SERVER agent's key (Finder/Reserve), not the assistant's key
-        feedback_pk = os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT')
-        auth_result = adapter.get_feedback_auth_id(
+        auth_result = await adapter.aget_feedback_auth_id(
             client_agent_id=client_id,
             server_agent_id=target_id,
         )
@@ -385,16 +624,13 @@ class RoutingAgent:
         # Save mapping for FeedbackAuthID (store target id -> assistant address)
         try:
             self.authorized_feedback_agent_ids.add(target_id)
-            client_addr = auth_result.get('client_address') or client_info.get('address', '')
-            if not client_addr:
-                # Derive from assistant signing key if available
-                pk_env = os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT')
-                if pk_env:
-                    try:
-                        from eth_account import Account  # type: ignore
-                        client_addr = Account.from_key(pk_env).address
-                    except Exception:
-                        client_addr = ''
+            # Fall back to the address derived from the assistant signing key
+            client_addr = (
+                auth_result.get('client_address')
+                or client_info.get('address', '')
+                or self._assistant_address
+                or ''
+            )
             if client_addr:
                 self.authorized_feedback_agent_addr_by_id[target_id] = client_addr
             # Persist event-provided FeedbackAuthID if present
@@ -420,12 +656,10 @@ class RoutingAgent:
         # Determine variant and resolve domain
         resolved_name = self._resolve_agent_name(agent_name) or ''
         is_reserve = 'reserve' in resolved_name.lower()
-        domain_env = 'RESERVE_DOMAIN' if is_reserve else 'FINDER_DOMAIN'
-        fallback_domain = 'reserve.localhost:10002' if is_reserve else 'finder.localhost:10002'
-        domain = os.getenv(domain_env, fallback_domain)
-
-        adapter = Erc8004Adapter()
-        info = adapter.get_agent_by_domain(domain)
+        domain = self.env.reserve_domain if is_reserve else self.env.finder_domain
+        # Assistant (client) id, needed below for authorization
+        adapter = get_default_adapter()
+        info, client_info = await self._lookup_with_assistant(domain)
         if not info or not info.get('agent_id'):
             return {
                 'status': 'error',
@@ -448,16 +682,10 @@ class RoutingAgent:
             feedback_auth_id = self.authorized_feedback_auth_id_by_target_id.get(agent_id)
         else:
             try:
-                # Resolve assistant client id
-                client_domain = (
-                    os.getenv('ASSISTANT_DOMAIN')
-                    or 'assistant.localhost:8083'
-                )
-                client_info = adapter.get_agent_by_domain(client_domain)
                 if client_info and client_info.get('agent_id'):
                     # Call acceptFeedback with server=target_id (reserve/finder), client=assistant
                     # Server key (Finder/Reserve)
-                    auth_res = adapter.get_feedback_auth_id(
+                    auth_res = await adapter.aget_feedback_auth_id(
                         client_agent_id=int(client_info['agent_id']),
                         server_agent_id=agent_id
                     )
@@ -465,13 +693,12 @@ class RoutingAgent:
                         feedback_auth_id = str(auth_res['feedback_auth_id'])
                         self.authorized_feedback_auth_id_by_target_id[agent_id] = feedback_auth_id
                         # Also keep client address for fallback display
-                        client_addr = auth_res.get('client_address') or client_info.get('address', '')
-                        if not client_addr and os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT'):
-                            try:
-                                from eth_account import Account  # type: ignore
-                                client_addr = Account.from_key(os.getenv('ERC8004_PRIVATE_KEY_ASSISTANT')).address
-                            except Exception:
-                                client_addr = ''
+                        client_addr = (
+                            auth_res.get('client_address')
+                            or client_info.get('address', '')
+                            or self._assistant_address
+                            or ''
+                        )
                         if client_addr:
                             self.authorized_feedback_agent_addr_by_id[agent_id] = client_addr
                         self.authorized_feedback_agent_ids.add(agent_id)
@@ -482,7 +709,7 @@ class RoutingAgent:
         # Feedback is stored client-side and exposed via feedback.json.
         # Build feedback record for export endpoint
         try:
-            chain_id = os.getenv('ERC8004_CHAIN_ID', '11155111')
+            chain_id = self.env.chain_id
             # Prefer event-provided FeedbackAuthID; fallback to CAIP-10 with client address if available
             if not feedback_auth_id and agent_id in self.authorized_feedback_agent_ids:
                 auth_addr = self.authorized_feedback_agent_addr_by_id.get(agent_id, '')
@@ -491,20 +718,16 @@ class RoutingAgent:
             # Final attempt: fetch via view getFeedbackAuthId(client=assistant, server=target)
             if not feedback_auth_id:
                 try:
-                    client_domain = (
-                        os.getenv('ASSISTANT_DOMAIN')
-                        or 'assistant.localhost:8083'
-                    )
-                    client_info = adapter.get_agent_by_domain(client_domain)
                     if client_info and client_info.get('agent_id'):
-                        fetched_auth = adapter.get_feedback_auth_id(int(client_info['agent_id']), agent_id)
+                        fetched_auth = await adapter.aget_feedback_auth_id(int(client_info['agent_id']), agent_id)
                         if fetched_auth:
                             feedback_auth_id = fetched_auth
                 except Exception:
                     pass
             # Pull task/context ids if available
-            task_ids_by_agent = state.get('task_ids_by_agent', {}) if isinstance(state.get('task_ids_by_agent'), dict) else {}
-            context_ids_by_agent = state.get('context_ids_by_agent', {}) if isinstance(state.get('context_ids_by_agent'), dict) else {}
+            session = self.ensure_session_state(state)
+            task_ids_by_agent = session.task_ids
+            context_ids_by_agent = session.context_ids
             task_id = task_ids_by_agent.get(agent_name) or task_ids_by_agent.get(resolved_name) or ''
             context_id = context_ids_by_agent.get(agent_name) or context_ids_by_agent.get(resolved_name) or ''
             agent_skill_id = ('reserve:v1' if is_reserve else 'finder:v1')
@@ -520,7 +743,7 @@ class RoutingAgent:
             }
             # Optionally include ProofOfPayment if caller provided one in state/env
             proof_tx = state.get('payment_tx_hash') if isinstance(state, dict) else None
-            proof_tx = proof_tx or os.getenv('FEEDBACK_PAYMENT_TX')
+            proof_tx = proof_tx or self.env.feedback_payment_tx
             if proof_tx:
                 record['ProofOfPayment'] = {'txHash': str(proof_tx)}
             self.feedback_records.append(record)
@@ -551,29 +774,24 @@ class RoutingAgent:
         resolved_name = self._resolve_agent_name(agent_name)
         if not resolved_name:
             raise ValueError(f'Agent {agent_name} not found')
-        state['active_agent'] = resolved_name
+        session = self.ensure_session_state(state)
+        session.active_agent = resolved_name
         client = self.remote_agent_connections[resolved_name]
 
         if not client:
             raise ValueError(f'Client not available for {agent_name}')
         # Track task ids per remote agent so we don't send a task id from one
         # agent to another.
-        task_ids_by_agent = state.get('task_ids_by_agent')
-        if task_ids_by_agent is None or not isinstance(task_ids_by_agent, dict):
-            task_ids_by_agent = {}
-            state['task_ids_by_agent'] = task_ids_by_agent
+        task_ids_by_agent = session.task_ids
         # Only include a task id if we already have one for this agent.
         task_id = task_ids_by_agent.get(agent_name)
 
         # Track context ids per remote agent as well.
-        context_ids_by_agent = state.get('context_ids_by_agent')
-        if context_ids_by_agent is None or not isinstance(context_ids_by_agent, dict):
-            context_ids_by_agent = {}
-            state['context_ids_by_agent'] = context_ids_by_agent
+        context_ids_by_agent = session.context_ids
         if agent_name in context_ids_by_agent:
             context_id = context_ids_by_agent[agent_name]
         else:
-            context_id = str(uuid.uuid4())
+            context_id = _new_id()
             context_ids_by_agent[agent_name] = context_id
 
         message_id = ''
@@ -583,7 +801,7 @@ class RoutingAgent:
             if 'message_id' in state['input_message_metadata']:
                 message_id = state['input_message_metadata']['message_id']
         if not message_id:
-            message_id = str(uuid.uuid4())
+            message_id = _new_id()
 
         payload = {
             'message': {
@@ -596,18 +814,15 @@ class RoutingAgent:
         }
 
         # Attach client agent id (assistant) for downstream server-side authorization
-        try:
-            adapter = Erc8004Adapter()
-            client_domain = (
-                os.getenv('ASSISTANT_DOMAIN')
-                or 'assistant.localhost:8083'
-            )
-            client_info = adapter.get_agent_by_domain(client_domain)
-            client_id_val = int(client_info['agent_id']) if (client_info and client_info.get('agent_id')) else None
-            if client_id_val is not None:
-                payload['message']['metadata'] = {'client_agent_id': str(client_id_val)}
-        except Exception:
-            pass
+        client_info = self._assistant_info
+        if client_info is None:
+            try:
+                client_info = (await self._lookup_with_assistant())[-1]
+            except Exception as e:
+                # The message still goes out, just without the id
+                logger.warning('ERC-8004: assistant registry lookup failed: %s', e)
+        if client_info and client_info.get('agent_id'):
+            payload['message']['metadata'] = {'client_agent_id': str(int(client_info['agent_id']))}
 
         if task_id:
             payload['message']['taskId'] = task_id
@@ -621,17 +836,15 @@ class RoutingAgent:
         send_response: SendMessageResponse = await client.send_message(
             message_request=message_request
         )
-        print(
-            'send_response',
-            send_response.model_dump_json(exclude_none=True, indent=2),
-        )
+        # repr is only built when debug logging is on
+        logger.debug('send_response=%s', send_response)
 
         if not isinstance(send_response.root, SendMessageSuccessResponse):
-            print('received non-success response. Aborting get task ')
+            logger.warning('received non-success response. Aborting get task')
             return None
 
         if not isinstance(send_response.root.result, Task):
-            print('received non-task response. Aborting get task ')
+            logger.warning('received non-task response. Aborting get task')
             return None
 
         # Persist the real task id for this agent for subsequent updates/messages
@@ -645,257 +858,259 @@ class RoutingAgent:
     async def handle(self, user_text: str, state: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
         """Core routing loop using OpenAI tool-calling.
 
-        Yields structured dict events: {type: 'tool_call'|'tool_response'|'final', name?, content}
+        Yields structured dict events: {type: 'tool_call'|'tool_response'|'partial'|'final', name?, content}.
+        'partial' carries the answer text streamed so far.
         """
-        self.ensure_session_state(state)
+        session = self.ensure_session_state(state)
         await self._refresh_cards_if_needed()
 
         client = self._openai_client()
-        model = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
-
-        allowed_agents = list(self.remote_agent_connections.keys())
-        tools: List[Dict[str, Any]] = [
-            {
-                'type': 'function',
-                'function': {
-                    'name': 'send_message',
-                    'description': 'Send a task to a remote agent and obtain its response.',
-                    'parameters': {
-                        'type': 'object',
-                        'properties': {
-                            'agent_name': {
-                                'type': 'string',
-                                'description': 'Name of the remote agent',
-                                'enum': allowed_agents,
-                            },
-                            'task': {'type': 'string', 'description': 'Task to send to the agent'},
-                        },
-                        'required': ['agent_name', 'task'],
-                    },
-                },
-            },
-            {
-                'type': 'function',
-                'function': {
-                    'name': 'leave_feedback',
-                    'description': 'Leave feedback for an agent via ERC-8004 reputation registry (rating 1-5).',
-                    'parameters': {
-                        'type': 'object',
-                        'properties': {
-                            'agent_name': {
-                                'type': 'string',
-                                'description': 'Name of the agent to leave feedback for',
-                                'enum': allowed_agents,
-                            },
-                            'rating': {'type': 'integer', 'minimum': 1, 'maximum': 5},
-                            'comment': {'type': 'string'},
-                        },
-                        'required': ['agent_name', 'rating', 'comment'],
-                    },
-                },
-            },
-            {
-                'type': 'function',
-                'function': {
-                    'name': 'authorize_feedback',
-                    'description': 'Authorize a client (assistant) agent to provide feedback for a target agent.',
-                    'parameters': {
-                        'type': 'object',
-                        'properties': {
-                            'client_agent_name': {
-                                'type': 'string',
-                                'description': 'Name of the client agent (Assistant) providing feedback',
-                                'enum': allowed_agents + ['assistant'],
-                            },
-                            'target_agent_name': {
-                                'type': 'string',
-                                'description': 'Name of the target agent (Finder/Reserve) to authorize feedback for',
-                                'enum': allowed_agents,
-                            },
-                        },
-                        'required': ['client_agent_name', 'target_agent_name'],
-                    },
-                },
-            },
-        ]
+        model = self.env.openai_model
 
-        system_prompt = self._build_system_prompt(state)
+        # Fixed system prefix + earlier turns form a stable, append-only prefix
+        # for the provider's prompt cache; only the tail below changes per turn
+        session.trim_history()
         messages: List[Dict[str, Any]] = [
-            {'role': 'system', 'content': system_prompt},
-            {'role': 'user', 'content': user_text},
+            self._system_message,
+            *session.history,
+            self._active_agent_message(state),
         ]
+        turn_start = len(messages)
+        messages.append({'role': 'user', 'content': user_text})
 
         final_text = ''
         max_steps = 6
         for _ in range(max_steps):
-            step_resp = client.chat.completions.create(
+            stream = await client.chat.completions.create(
                 model=model,
                 messages=messages,
-                tools=tools,
+                tools=self._tools_schema,
                 tool_choice='auto',
+                stream=True,
             )
 
-            assistant_msg = step_resp.choices[0].message
-            tool_calls = getattr(assistant_msg, 'tool_calls', None) or []
-
-            if not tool_calls:
-                final_text = assistant_msg.content or ''
+            # Reassemble the streamed message; tool calls arrive as per-index fragments
+            content_parts: list[str] = []
+            calls_by_index: dict[int, Dict[str, Any]] = {}
+            unflushed = 0
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                for tc_delta in delta.tool_calls or ():
+                    call = calls_by_index.setdefault(
+                        tc_delta.index,
+                        {'id': '', 'type': 'function', 'function': {'name': '', 'arguments': ''}},
+                    )
+                    if tc_delta.id:
+                        call['id'] = tc_delta.id
+                    if tc_delta.function:
+                        call['function']['name'] += tc_delta.function.name or ''
+                        call['function']['arguments'] += tc_delta.function.arguments or ''
+                if delta.content:
+                    content_parts.append(delta.content)
+                    unflushed += len(delta.content)
+                    # Answer text goes to the UI as it arrives, unless this step is a tool call
+                    if not calls_by_index and unflushed >= STREAM_YIELD_CHARS:
+                        unflushed = 0
+                        yield {'type': 'partial', 'content': ''.join(content_parts)}
+            content = ''.join(content_parts)
+            # Terminal step: the answer goes straight to history and the UI
+            if not calls_by_index:
+                final_text = content
                 break
+            tool_calls = [calls_by_index[i] for i in sorted(calls_by_index)]
 
             messages.append({
                 'role': 'assistant',
-                'content': assistant_msg.content or '',
-                'tool_calls': [tc.to_dict() for tc in tool_calls],
+                'content': content,
+                'tool_calls': tool_calls,
             })
 
+            parsed_calls = []
             for tc in tool_calls:
-                func_name = tc.function.name
                 try:
-                    args = json.loads(tc.function.arguments or '{}')
-                except json.JSONDecodeError:
+                    args = orjson.loads(tc['function']['arguments'] or '{}')
+                except orjson.JSONDecodeError:
                     args = {}
+                parsed_calls.append((tc, args))
+
+            # Independent send_message calls (one per remote agent) run
+            # concurrently; events and tool messages still follow call order.
+            # Repeat calls to the same agent run in order so they see its task id.
+            in_flight: dict[str, asyncio.Task] = {}
+            seen_agents: set[str] = set()
+            for tc, args in parsed_calls:
+                if tc['function']['name'] != 'send_message':
+                    continue
+                agent_name = args.get('agent_name')
+                # Aliases and case variants of one agent share its task id
+                agent_key = self._resolve_agent_name(agent_name) or agent_name
+                if agent_key in seen_agents:
+                    continue
+                seen_agents.add(agent_key)
+                in_flight[tc['id']] = asyncio.create_task(
+                    self.send_message(agent_name, args.get('task', ''), state)
+                )
 
-                yield {'type': 'tool_call', 'name': func_name, 'content': args}
+            try:
+                for tc, args in parsed_calls:
+                    func_name = tc['function']['name']
 
-                if func_name == 'send_message':
-                    agent_name = args.get('agent_name')
-                    task = args.get('task', '')
-                    try:
-                        result = await self.send_message(agent_name, task, state)
-                        result_json = (
-                            result.model_dump(exclude_none=True) if hasattr(result, 'model_dump') else str(result)
-                        )
-                        messages.append({
-                            'role': 'tool',
-                            'tool_call_id': tc.id,
-                            'name': func_name,
-                            'content': json.dumps(result_json),
-                        })
-                        yield {'type': 'tool_response', 'name': func_name, 'content': result_json}
-                    except Exception as e:
-                        error_msg = f"Routing error: {type(e).__name__}: {e} | Allowed agents: {allowed_agents}"
-                        messages.append({
-                            'role': 'tool',
-                            'tool_call_id': tc.id,
-                            'name': func_name,
-                            'content': error_msg,
-                        })
-                        yield {'type': 'tool_response', 'name': func_name, 'content': {'error': error_msg}}
-                elif func_name == 'leave_feedback':
-                    agent_name = args.get('agent_name')
-                    rating = args.get('rating', 5)
-                    comment = args.get('comment', '')
-                    try:
-                        result = await self.submit_feedback(agent_name, rating, comment, state)
-                        messages.append({
-                            'role': 'tool',
-                            'tool_call_id': tc.id,
-                            'name': func_name,
-                            'content': json.dumps(result),
-                        })
-                        yield {'type': 'tool_response', 'name': func_name, 'content': result}
-                    except Exception as e:
-                        error_msg = f"Feedback error: {type(e).__name__}: {e}"
-                        messages.append({
-                            'role': 'tool',
-                            'tool_call_id': tc.id,
-                            'name': func_name,
-                            'content': error_msg,
-                        })
-                        yield {'type': 'tool_response', 'name': func_name, 'content': {'error': error_msg}}
-                elif func_name == 'authorize_feedback':
-                    client_agent_name = args.get('client_agent_name')
-                    target_agent_name = args.get('target_agent_name')
-                    try:
-                        result = await self._authorize_feedback(client_agent_name, target_agent_name)
-                        messages.append({
-                            'role': 'tool',
-                            'tool_call_id': tc.id,
-                            'name': func_name,
-                            'content': json.dumps(result),
-                        })
-                        yield {'type': 'tool_response', 'name': func_name, 'content': result}
-                    except Exception as e:
-                        error_msg = f"Authorize feedback error: {type(e).__name__}: {e}"
+                    yield {'type': 'tool_call', 'name': func_name, 'content': args}
+
+                    if func_name == 'send_message':
+                        agent_name = args.get('agent_name')
+                        task = args.get('task', '')
+                        try:
+                            if tc['id'] in in_flight:
+                                result = await in_flight.pop(tc['id'])
+                            else:
+                                result = await self.send_message(agent_name, task, state)
+                            # pydantic-core serializes the task straight to JSON for the LLM
+                            if hasattr(result, 'model_dump_json'):
+                                result_text = result.model_dump_json(exclude_none=True)
+                                result_json = orjson.loads(result_text)
+                            else:
+                                result_json = str(result)
+                                result_text = orjson.dumps(result_json).decode()
+                            messages.append({
+                                'role': 'tool',
+                                'tool_call_id': tc['id'],
+                                'name': func_name,
+                                'content': result_text,
+                            })
+                            yield {'type': 'tool_response', 'name': func_name, 'content': result_json}
+                        except Exception as e:
+                            error_msg = f"Routing error: {type(e).__name__}: {e} | Allowed agents: {self._allowed_agents}"
+                            messages.append({
+                                'role': 'tool',
+                                'tool_call_id': tc['id'],
+                                'name': func_name,
+                                'content': error_msg,
+                            })
+                            yield {'type': 'tool_response', 'name': func_name, 'content': {'error': error_msg}}
+                    elif func_name == 'leave_feedback':
+                        agent_name = args.get('agent_name')
+                        rating = args.get('rating', 5)
+                        comment = args.get('comment', '')
+                        try:
+                            result = await self.submit_feedback(agent_name, rating, comment, state)
+                            messages.append({
+                                'role': 'tool',
+                                'tool_call_id': tc['id'],
+                                'name': func_name,
+                                'content': orjson.dumps(result).decode(),
+                            })
+                            yield {'type': 'tool_response', 'name': func_name, 'content': result}
+                        except Exception as e:
+                            error_msg = f"Feedback error: {type(e).__name__}: {e}"
+                            messages.append({
+                                'role': 'tool',
+                                'tool_call_id': tc['id'],
+                                'name': func_name,
+                                'content': error_msg,
+                            })
+                            yield {'type': 'tool_response', 'name': func_name, 'content': {'error': error_msg}}
+                    elif func_name == 'authorize_feedback':
+                        client_agent_name = args.get('client_agent_name')
+                        target_agent_name = args.get('target_agent_name')
+                        try:
+                            result = await self._authorize_feedback(client_agent_name, target_agent_name)
+                            messages.append({
+                                'role': 'tool',
+                                'tool_call_id': tc['id'],
+                                'name': func_name,
+                                'content': orjson.dumps(result).decode(),
+                            })
+                            yield {'type': 'tool_response', 'name': func_name, 'content': result}
+                        except Exception as e:
+                            error_msg = f"Authorize feedback error: {type(e).__name__}: {e}"
+                            messages.append({
+                                'role': 'tool',
+                                'tool_call_id': tc['id'],
+                                'name': func_name,
+                                'content': error_msg,
+                            })
+                            yield {'type': 'tool_response', 'name': func_name, 'content': {'error': error_msg}}
+                    else:
                         messages.append({
                             'role': 'tool',
-                            'tool_call_id': tc.id,
+                            'tool_call_id': tc['id'],
                             'name': func_name,
-                            'content': error_msg,
+                            'content': f'Unknown tool: {func_name}',
                         })
-                        yield {'type': 'tool_response', 'name': func_name, 'content': {'error': error_msg}}
-                else:
-                    messages.append({
-                        'role': 'tool',
-                        'tool_call_id': tc.id,
-                        'name': func_name,
-                        'content': f'Unknown tool: {func_name}',
-                    })
-                    yield {'type': 'tool_response', 'name': func_name, 'content': {'error': 'Unknown tool'}}
-
+                        yield {'type': 'tool_response', 'name': func_name, 'content': {'error': 'Unknown tool'}}
+            finally:
+                # Closed early (client went away): don't leave sends running unobserved
+                for pending in in_flight.values():
+                    pending.cancel()
+
+        session.history.extend(messages[turn_start:])
+        session.history.append({'role': 'assistant', 'content': final_text})
         yield {'type': 'final', 'content': final_text}
 
 
-def _get_initialized_routing_agent_sync() -> RoutingAgent:
-    """Synchronously creates and initializes the RoutingAgent."""
-
-    async def _async_main() -> RoutingAgent:
-        # Prefer resolving domains from ERC-8004 Identity Registry, with env fallbacks
-        adapter = Erc8004Adapter()
+async def _create_root_agent() -> RoutingAgent:
+    """Resolve remote agent addresses and create the initialized RoutingAgent."""
+    # Prefer resolving domains from ERC-8004 Identity Registry, with env fallbacks
+    adapter = get_default_adapter()
 
-        def _domain_to_url_if_present(info: dict | None) -> str | None:
-            # Only build URL if registry returned a domain; no env/hardcoded fallback
-            try:
-                if info and isinstance(info, dict):
-                    dom = (info.get('domain') or '').strip()
-                    if dom:
-                        if dom.startswith('http://') or dom.startswith('https://'):
-                            return dom
-                        return f'http://{dom}'
-            except Exception:
-                return None
+    def _domain_to_url_if_present(info: dict | None) -> str | None:
+        # Only build URL if registry returned a domain; no env/hardcoded fallback
+        try:
+            if info and isinstance(info, dict):
+                dom = (info.get('domain') or '').strip()
+                if dom:
+                    if dom.startswith('http://') or dom.startswith('https://'):
+                        return dom
+                    return f'http://{dom}'
+        except Exception:
             return None
+        return None
 
-        finder_domain_hint = os.getenv('FINDER_DOMAIN', 'finder.localhost:10002')
-        reserve_domain_hint = os.getenv('RESERVE_DOMAIN', 'reserve.localhost:10002')
+    env = EnvConfig.from_env()
+    finder_domain_hint = env.finder_domain
+    reserve_domain_hint = env.reserve_domain
 
-        finder_info = None
-        reserve_info = None
-        try:
-            finder_info = adapter.get_agent_by_domain(finder_domain_hint)
-        except Exception:
-            finder_info = None
-        try:
-            reserve_info = adapter.get_agent_by_domain(reserve_domain_hint)
-        except Exception:
-            reserve_info = None
-
-        addresses: list[str] = []
-        finder_url = _domain_to_url_if_present(finder_info)
-        if finder_url:
-            addresses.append(finder_url)
-        reserve_url = _domain_to_url_if_present(reserve_info)
-        if reserve_url:
-            addresses.append(reserve_url)
-        # Weather remains always available via env or default
-        weather_url = os.getenv('WEA_AGENT_URL', 'http://localhost:10001')
-        addresses.append(weather_url)
-
-        routing_agent_instance = await RoutingAgent.create(
-            remote_agent_addresses=addresses
+    # Both lookups share one batched registry read off the event loop
+    try:
+        finder_info, reserve_info = await adapter.aget_agents_by_domains(
+            finder_domain_hint, reserve_domain_hint
         )
-        return routing_agent_instance
+    except Exception:
+        finder_info = reserve_info = None
 
-    try:
-        return asyncio.run(_async_main())
-    except RuntimeError as e:
-        if 'asyncio.run() cannot be called from a running event loop' in str(e):
-            print(
-                f'Warning: Could not initialize RoutingAgent with asyncio.run(): {e}. '
-                'This can happen if an event loop is already running (e.g., in Jupyter). '
-                'Consider initializing RoutingAgent within an async function in your application.'
-            )
-        raise
+    addresses: list[str] = []
+    finder_url = _domain_to_url_if_present(finder_info)
+    if finder_url:
+        addresses.append(finder_url)
+    reserve_url = _domain_to_url_if_present(reserve_info)
+    if reserve_url:
+        addresses.append(reserve_url)
+    # Weather remains always available via env or default
+    weather_url = os.getenv('WEA_AGENT_URL', 'http://localhost:10001')
+    addresses.append(weather_url)
 
+    routing_agent_instance = await RoutingAgent.create(
+        remote_agent_addresses=addresses
+    )
+    return routing_agent_instance
 
-root_agent = _get_initialized_routing_agent_sync()
+
+_root_agent: RoutingAgent | None = None
+_root_agent_lock = asyncio.Lock()
+
+
+async def get_root_agent() -> RoutingAgent:
+    """Return the process-wide RoutingAgent, creating it on first use.
+
+    Creation resolves registry entries and fetches remote agent cards, so it
+    runs on the caller's (serving) loop rather than at import time.
+    """
+    global _root_agent
+    if _root_agent is None:
+        async with _root_agent_lock:
+            if _root_agent is None:
+                _root_agent = await _create_root_agent()
+    return _root_agent
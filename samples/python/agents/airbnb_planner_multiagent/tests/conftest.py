@@ -0,0 +1,14 @@
+import os
+import sys
+
+
+# The sample's packages are run from their own directories, so sibling modules
+# import each other as top-level modules (e.g. `from routing_agent import ...`)
+_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (
+    _root,
+    os.path.join(_root, 'host_agent'),
+    os.path.join(_root, 'weather_agent'),
+):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -0,0 +1,159 @@
+import pytest
+
+
+pytest.importorskip('orjson')
+
+from common_utils.erc8004_adapter import Erc8004Adapter
+
+
+class _FakeEth:
+    """Stands in for ``w3.eth``; gas grows with the calldata length."""
+
+    def __init__(self):
+        self.estimates = []
+
+    def estimate_gas(self, tx):
+        self.estimates.append(tx)
+        return 21000 + 16 * len(tx['data'])
+
+
+class _FakeW3:
+    def __init__(self):
+        self.eth = _FakeEth()
+
+
+class _FakeFn:
+    address = '0x0000000000000000000000000000000000000001'
+    fn_name = 'newAgent'
+
+
+@pytest.fixture
+def adapter(monkeypatch):
+    monkeypatch.setenv('ERC8004_ENABLED', 'false')
+    monkeypatch.delenv('ERC8004_RPC_URL', raising=False)
+    adapter = Erc8004Adapter()
+    adapter._w3 = _FakeW3()
+    return adapter
+
+
+def test_estimate_gas_differs_per_domain(adapter):
+    params = {'from': '0xabc', 'value': 0}
+    short = adapter._estimate_gas(_FakeFn(), '0x' + 'aa' * 4, params, 1)
+    long = adapter._estimate_gas(_FakeFn(), '0x' + 'aa' * 64, params, 1)
+
+    assert long > short
+    assert len(adapter._w3.eth.estimates) == 2
+
+
+def test_estimate_gas_reuses_identical_call(adapter):
+    params = {'from': '0xabc', 'value': 0}
+    first = adapter._estimate_gas(_FakeFn(), '0x1234', params, 1)
+    second = adapter._estimate_gas(_FakeFn(), '0x1234', dict(params), 1)
+
+    assert first == second
+    assert len(adapter._w3.eth.estimates) == 1
+
+
+def test_estimate_gas_not_shared_across_adapters(adapter):
+    params = {'from': '0xabc', 'value': 0}
+    adapter._estimate_gas(_FakeFn(), '0x1234', params, 1)
+    other = Erc8004Adapter()
+    other._w3 = _FakeW3()
+    other._estimate_gas(_FakeFn(), '0x1234', params, 1)
+
+    assert len(other._w3.eth.estimates) == 1
+
+
+def test_estimate_gas_failure_uses_default_and_is_not_cached(adapter):
+    def boom(tx):
+        raise ValueError('execution reverted')
+
+    adapter._w3.eth.estimate_gas = boom
+    assert adapter._estimate_gas(_FakeFn(), '0x1234', {'from': '0xabc'}, 300000) == 300000
+    assert not adapter._gas_limit_cache
+
+
+_CLIENT, _SERVER = 7, 9
+_REGISTRY = '0x00000000000000000000000000000000000000Aa'
+_AUTH_TOPIC = b'\x01' * 32
+_REGISTERED_TOPIC = b'\x02' * 32
+
+
+def _word(n: int) -> bytes:
+    return n.to_bytes(32, 'big')
+
+
+def _auth_log(client=_CLIENT, server=_SERVER, topic=_AUTH_TOPIC, address=_REGISTRY):
+    return {
+        'address': address,
+        'topics': [topic, _word(client), _word(server), b'\xab' * 32],
+    }
+
+
+@pytest.fixture
+def receipt_adapter(adapter):
+    adapter.reputation_registry = _REGISTRY
+    adapter._auth_feedback_topic = _AUTH_TOPIC
+    return adapter
+
+
+def test_feedback_auth_id_from_matching_log(receipt_adapter):
+    receipt = {'logs': [_auth_log()]}
+
+    assert receipt_adapter._feedback_auth_id_from_receipt(
+        receipt, _CLIENT, _SERVER
+    ) == '0x' + 'ab' * 32
+
+
+@pytest.mark.parametrize(
+    'log',
+    [
+        _auth_log(topic=b'\x03' * 32),
+        _auth_log(address='0x00000000000000000000000000000000000000bb'),
+        _auth_log(client=_CLIENT + 1),
+        _auth_log(server=_SERVER + 1),
+        {'address': _REGISTRY, 'topics': [_AUTH_TOPIC]},
+    ],
+    ids=['other-event', 'other-contract', 'other-client', 'other-server', 'short-topics'],
+)
+def test_feedback_auth_id_ignores_other_logs(receipt_adapter, log):
+    assert receipt_adapter._feedback_auth_id_from_receipt(
+        {'logs': [log]}, _CLIENT, _SERVER
+    ) is None
+
+
+def test_feedback_auth_id_matches_registry_address_case_insensitively(receipt_adapter):
+    receipt = {'logs': [_auth_log(address=_REGISTRY.lower())]}
+
+    assert receipt_adapter._feedback_auth_id_from_receipt(receipt, _CLIENT, _SERVER)
+
+
+class _FakeAgentRegistered:
+    def __init__(self):
+        self.decoded = []
+
+    def process_log(self, log):
+        self.decoded.append(log)
+        return {'args': {'agentId': log['agent_id']}}
+
+
+def test_agent_id_from_receipt_decodes_only_matching_topic(adapter):
+    event = _FakeAgentRegistered()
+    adapter._agent_registered_event = event
+    adapter._agent_registered_topic = _REGISTERED_TOPIC
+    receipt = {
+        'logs': [
+            {'topics': [b'\x04' * 32], 'agent_id': 1},
+            {'topics': [], 'agent_id': 2},
+            {'topics': [_REGISTERED_TOPIC], 'agent_id': 3},
+        ]
+    }
+
+    assert adapter._agent_id_from_receipt(receipt) == 3
+    assert [log['agent_id'] for log in event.decoded] == [3]
+
+
+def test_agent_id_from_receipt_without_bound_event(adapter):
+    receipt = {'logs': [{'topics': [_REGISTERED_TOPIC], 'agent_id': 3}]}
+
+    assert adapter._agent_id_from_receipt(receipt) is None
@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+
+pytest.importorskip('a2a')
+pytest.importorskip('openai')
+pytest.importorskip('orjson')
+pytest.importorskip('dotenv')
+
+import httpx
+import routing_agent
+
+from routing_agent import (
+    HISTORY_CACHE_BUFFER,
+    HISTORY_RECENT_MESSAGES,
+    AgentSession,
+    _retry,
+)
+
+
+def _turn(n: int) -> list[dict]:
+    return [
+        {'role': 'user', 'content': f'question {n}'},
+        {'role': 'assistant', 'content': f'answer {n}'},
+    ]
+
+
+def test_trim_history_is_a_noop_within_the_window():
+    session = AgentSession()
+    for n in range((HISTORY_RECENT_MESSAGES + HISTORY_CACHE_BUFFER) // 2):
+        session.history.extend(_turn(n))
+    before = list(session.history)
+
+    session.trim_history()
+
+    assert session.history == before
+
+
+def test_trim_history_cuts_back_to_a_user_turn():
+    session = AgentSession()
+    for n in range(HISTORY_RECENT_MESSAGES + HISTORY_CACHE_BUFFER):
+        session.history.extend(_turn(n))
+    # An odd tail puts the RECENT boundary on an assistant message
+    session.history.append({'role': 'user', 'content': 'last'})
+
+    session.trim_history()
+
+    assert session.history[0]['role'] == 'user'
+    assert len(session.history) <= HISTORY_RECENT_MESSAGES
+    assert session.history[-1]['content'] == 'last'
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(routing_agent.asyncio, 'sleep', fake_sleep)
+    monkeypatch.setattr(routing_agent.random, 'random', lambda: 1.0)
+    return delays
+
+
+def _flaky(failures: int, exc: Exception):
+    calls = []
+
+    async def call():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise exc
+        return 'ok'
+
+    return call, calls
+
+
+def test_retry_backs_off_exponentially_up_to_the_cap(sleeps):
+    call, calls = _flaky(3, httpx.ConnectError('down'))
+
+    assert asyncio.run(_retry(call, max_retries=3, base=1.0, cap=3.0)) == 'ok'
+    assert len(calls) == 4
+    assert sleeps == [1.0, 2.0, 3.0]
+
+
+def test_retry_gives_up_after_max_retries(sleeps):
+    call, calls = _flaky(10, httpx.ReadTimeout('slow'))
+
+    with pytest.raises(httpx.ReadTimeout):
+        asyncio.run(_retry(call, max_retries=2))
+    assert len(calls) == 3
+
+
+def test_retry_does_not_retry_permanent_errors(sleeps):
+    call, calls = _flaky(1, ValueError('bad card'))
+
+    with pytest.raises(ValueError):
+        asyncio.run(_retry(call))
+    assert len(calls) == 1
+    assert sleeps == []
@@ -0,0 +1,131 @@
+from collections import OrderedDict
+from types import SimpleNamespace
+
+import pytest
+
+
+pytest.importorskip('a2a')
+pytest.importorskip('openai')
+pytest.importorskip('orjson')
+pytest.importorskip('geopy')
+pytest.importorskip('mcp')
+
+import weather_executor
+
+from weather_executor import (
+    HISTORY_KEEP_TURNS,
+    HISTORY_MAX_MESSAGES,
+    SESSION_MAX,
+    SESSION_TTL_SEC,
+    TOOL_OUTPUT_KEEP_CHARS,
+    WeatherExecutor,
+    _prune_messages,
+)
+
+
+def _turn(n: int, output: str = 'x') -> list[dict]:
+    return [
+        {'role': 'user', 'content': f'question {n}'},
+        {'role': 'assistant', 'content': '', 'tool_calls': [{'id': f'c{n}'}]},
+        {'role': 'tool', 'tool_call_id': f'c{n}', 'name': 'get_forecast', 'content': output},
+        {'role': 'assistant', 'content': f'answer {n}'},
+    ]
+
+
+def _history(turns: int, output: str = 'x') -> list[dict]:
+    messages = [{'role': 'system', 'content': 'system'}]
+    for n in range(turns):
+        messages.extend(_turn(n, output))
+    return messages
+
+
+def test_prune_keeps_short_history():
+    messages = _history(2, 'y' * (TOOL_OUTPUT_KEEP_CHARS + 1))
+    before = [dict(m) for m in messages]
+
+    _prune_messages(messages)
+
+    assert messages == before
+
+
+def test_prune_stubs_old_tool_outputs_only():
+    long_output = 'y' * (TOOL_OUTPUT_KEEP_CHARS + 1)
+    messages = _history(HISTORY_KEEP_TURNS + 1, long_output)
+
+    _prune_messages(messages)
+
+    tools = [m for m in messages if m['role'] == 'tool']
+    assert tools[0]['content'] == '[evicted: get_forecast]'
+    assert all(m['content'] == long_output for m in tools[1:])
+
+
+def test_prune_drops_whole_turns_past_the_cap():
+    messages = _history(HISTORY_MAX_MESSAGES)
+
+    _prune_messages(messages)
+
+    assert messages[0]['role'] == 'system'
+    assert messages[1]['role'] == 'user'
+    assert len(messages) - 1 <= HISTORY_MAX_MESSAGES
+    # Every tool result still follows the assistant message that called it
+    call_ids = set()
+    for m in messages:
+        for tc in m.get('tool_calls', ()):
+            call_ids.add(tc['id'])
+        if m['role'] == 'tool':
+            assert m['tool_call_id'] in call_ids
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(weather_executor.time, 'monotonic', lambda: now[0])
+    return now
+
+
+def _sessions():
+    return SimpleNamespace(_sessions=OrderedDict())
+
+
+def test_session_is_reused_and_refreshed(clock):
+    executor = _sessions()
+    first = WeatherExecutor._get_session(executor, 'a')
+    first.append({'role': 'user', 'content': 'hi'})
+    clock[0] += SESSION_TTL_SEC - 1
+
+    assert WeatherExecutor._get_session(executor, 'a') is first
+    assert executor._sessions['a'][0] == clock[0]
+
+
+def test_session_expires_after_ttl(clock):
+    executor = _sessions()
+    first = WeatherExecutor._get_session(executor, 'a')
+    first.append({'role': 'user', 'content': 'hi'})
+    clock[0] += SESSION_TTL_SEC
+
+    again = WeatherExecutor._get_session(executor, 'a')
+
+    assert again is not first
+    assert [m['role'] for m in again] == ['system']
+
+
+def test_idle_sessions_are_evicted(clock):
+    executor = _sessions()
+    WeatherExecutor._get_session(executor, 'old')
+    clock[0] += SESSION_TTL_SEC
+    WeatherExecutor._get_session(executor, 'new')
+
+    assert list(executor._sessions) == ['new']
+
+
+def test_least_recently_used_session_is_evicted_past_max(clock):
+    executor = _sessions()
+    for i in range(SESSION_MAX):
+        WeatherExecutor._get_session(executor, str(i))
+    # Touch the oldest so the second-oldest is least recently used
+    WeatherExecutor._get_session(executor, '0')
+    WeatherExecutor._get_session(executor, 'extra')
+
+    assert len(executor._sessions) == SESSION_MAX
+    assert '0' in executor._sessions
+    assert '1' not in executor._sessions
@@ -1,10 +1,14 @@
+import asyncio
 import logging
-import json
 import os
+import time
 
+from collections import OrderedDict
 from typing import Any, Dict, List, Optional
 
-from openai import OpenAI
+import orjson
+
+from openai import AsyncOpenAI
 
 from a2a.server.agent_execution import AgentExecutor
 from a2a.server.agent_execution.context import RequestContext
@@ -20,6 +24,7 @@ from a2a.types import (
 from a2a.utils.errors import ServerError
 
 from weather_mcp import (
+    WeatherToolError,
     get_alerts,
     get_forecast,
     get_forecast_by_city,
@@ -35,10 +40,63 @@ SYSTEM_INSTRUCTION = (
     "utilize the provided tools to retrieve and relay weather information in response "
     "to user queries. You must rely exclusively on these tools for data and refrain "
     "from inventing information. Ensure that all responses include the detailed output "
-    "from the tools used and are formatted in Markdown."
+    "from the tools used and are formatted in Markdown. When a single forecast tool "
+    "call succeeds, its output is returned to the user as the answer without another "
+    "model turn, so call a forecast tool on its own only when its output fully "
+    "answers the question."
 )
 
 
+# Seconds a tool result is reused for identical arguments; alerts change faster
+TOOL_CACHE_TTL = {
+    'get_alerts': 120.0,
+    'get_forecast': 600.0,
+    'get_forecast_by_city': 600.0,
+}
+TOOL_CACHE_MAX = 256
+# A lone successful call to one of these already reads as a complete answer,
+# so it is returned as is instead of paying for a second model pass
+DIRECT_ANSWER_TOOLS = frozenset({'get_forecast', 'get_forecast_by_city'})
+
+# Streamed answer text is sent as a "working" update once this many chars build up
+STREAM_FLUSH_CHARS = 256
+
+# Conversations kept in memory: least recently used beyond SESSION_MAX, or idle
+# for longer than SESSION_TTL_SEC, are dropped
+SESSION_MAX = 1024
+SESSION_TTL_SEC = 3600.0
+
+# Session history bounds: tool outputs older than the last HISTORY_KEEP_TURNS
+# user turns are stubbed out, and whole old turns are dropped past the cap
+HISTORY_KEEP_TURNS = 5
+HISTORY_MAX_MESSAGES = 30
+TOOL_OUTPUT_KEEP_CHARS = 1024
+
+
+def _part_text(part: Part) -> str:
+    text = getattr(part.root, 'text', None)
+    return text if isinstance(text, str) else '[non-text content omitted]'
+
+
+def _prune_messages(messages: List[Dict[str, Any]]) -> None:
+    """Bound a session's message history in place.
+
+    The leading system message is never touched, and turns are only removed
+    whole so every tool message keeps its matching assistant tool call.
+    """
+    user_idx = [i for i, m in enumerate(messages) if m["role"] == "user"]
+    if len(user_idx) > HISTORY_KEEP_TURNS:
+        cutoff = user_idx[-HISTORY_KEEP_TURNS]
+        for m in messages[1:cutoff]:
+            if m["role"] == "tool" and len(m["content"]) > TOOL_OUTPUT_KEEP_CHARS:
+                m["content"] = f"[evicted: {m['name']}]"
+    if len(messages) - 1 > HISTORY_MAX_MESSAGES:
+        for i in user_idx[1:]:
+            if len(messages) - i <= HISTORY_MAX_MESSAGES:
+                del messages[1:i]
+                break
+
+
 class WeatherExecutor(AgentExecutor):
     """An AgentExecutor that uses the OpenAI Chat Completions API with tool calling."""
 
@@ -51,10 +109,13 @@ class WeatherExecutor(AgentExecutor):
     ) -> None:
         self._card = card
         self._active_sessions: set[str] = set()
-        self._sessions: dict[str, List[Dict[str, Any]]] = {}
+        # context_id -> (last used, message history), least recently used first
+        self._sessions: OrderedDict[str, tuple[float, List[Dict[str, Any]]]] = OrderedDict()
 
         self._model = model or os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
-        self._client = OpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
+        # One async client per process, so sessions share its connection pool
+        # and never block the event loop while waiting on the model
+        self._client = AsyncOpenAI(api_key=api_key or os.getenv('OPENAI_API_KEY'))
 
         # Define tool schemas for function calling
         self._tools: List[Dict[str, Any]] = [
@@ -104,6 +165,9 @@ class WeatherExecutor(AgentExecutor):
             },
         ]
 
+        # (tool name, canonical args) -> (monotonic_ts, output)
+        self._tool_cache: dict[tuple[str, bytes], tuple[float, str]] = {}
+
         self._tool_impl = {
             'get_alerts': get_alerts,
             'get_forecast': get_forecast,
@@ -123,77 +187,72 @@ class WeatherExecutor(AgentExecutor):
 
         try:
             # Build or reuse session message history
-            messages = self._sessions.get(session_id)
-            if messages is None:
-                messages = [
-                    {"role": "system", "content": SYSTEM_INSTRUCTION},
-                ]
-                self._sessions[session_id] = messages
+            messages = self._get_session(session_id)
 
             user_text = self._flatten_parts_to_text(context.message.parts)
             messages.append({"role": "user", "content": user_text})
+            _prune_messages(messages)
 
             # First pass: allow tool calling
-            initial = self._client.chat.completions.create(
-                model=self._model,
-                messages=messages,
-                tools=self._tools,
-                tool_choice="auto",
+            content, tool_calls = await self._stream_completion(
+                updater, messages=messages, tools=self._tools, tool_choice="auto"
             )
 
-            assistant_msg = initial.choices[0].message
-            tool_calls = getattr(assistant_msg, 'tool_calls', None) or []
-
             if tool_calls:
                 # Notify UI that tools are being used
                 await updater.update_status(
                     TaskState.working,
                     message=updater.new_agent_message(
-                        [TextPart(text=f"Using tools: {', '.join(tc.function.name for tc in tool_calls)}")]
+                        [TextPart(text=f"Using tools: {', '.join(tc['function']['name'] for tc in tool_calls)}")]
                     ),
                 )
 
+                # Parse each call's arguments exactly once
+                parsed_calls: List[tuple[str, str, Dict[str, Any]]] = []
+                for tc in tool_calls:
+                    func_args: Dict[str, Any] = {}
+                    try:
+                        if tc['function']['arguments']:
+                            func_args = orjson.loads(tc['function']['arguments'])
+                    except orjson.JSONDecodeError:
+                        func_args = {}
+                    parsed_calls.append((tc['id'], tc['function']['name'], func_args))
+
                 # Record assistant tool call message
                 messages.append(
                     {
                         "role": "assistant",
-                        "content": assistant_msg.content or "",
-                        "tool_calls": [tc.to_dict() for tc in tool_calls],
+                        "content": content,
+                        "tool_calls": tool_calls,
                     }
                 )
 
-                # Execute each tool call and append results
-                for tc in tool_calls:
-                    func_name = tc.function.name
-                    func_args: Dict[str, Any] = {}
-                    try:
-                        if tc.function.arguments:
-                            func_args = json.loads(tc.function.arguments)
-                    except json.JSONDecodeError:
-                        func_args = {}
-
-                    impl = self._tool_impl.get(func_name)
-                    tool_output = (
-                        await impl(**func_args) if impl is not None else f"Unknown tool: {func_name}"
-                    )
-
+                # Tool calls are independent lookups; run them concurrently and
+                # append results in call order to keep tool_call_id pairing
+                tool_results = await asyncio.gather(
+                    *(self._call_tool(name, args) for _, name, args in parsed_calls)
+                )
+                for (call_id, func_name, _), (tool_output, _) in zip(parsed_calls, tool_results):
                     messages.append(
                         {
                             "role": "tool",
-                            "tool_call_id": tc.id,
+                            "tool_call_id": call_id,
                             "name": func_name,
-                            "content": str(tool_output),
+                            "content": tool_output,
                         }
                     )
 
-                # Final pass: produce user-facing response
-                final = self._client.chat.completions.create(
-                    model=self._model,
-                    messages=messages,
-                )
-                final_text = final.choices[0].message.content or ""
+                if (
+                    len(parsed_calls) == 1
+                    and parsed_calls[0][1] in DIRECT_ANSWER_TOOLS
+                    and tool_results[0][1]
+                ):
+                    final_text = tool_results[0][0]
+                else:
+                    # Final pass: produce user-facing response
+                    final_text, _ = await self._stream_completion(updater, messages=messages)
             else:
-                final_text = assistant_msg.content or ""
+                final_text = content
 
             await updater.add_artifact([TextPart(text=final_text)])
             await updater.update_status(TaskState.completed, final=True)
@@ -201,6 +260,92 @@ class WeatherExecutor(AgentExecutor):
         finally:
             self._active_sessions.discard(session_id)
 
+    def _get_session(self, session_id: str) -> List[Dict[str, Any]]:
+        """Return the session's history, creating it and evicting stale sessions."""
+        now = time.monotonic()
+        entry = self._sessions.pop(session_id, None)
+        if entry is not None and now - entry[0] < SESSION_TTL_SEC:
+            messages = entry[1]
+        else:
+            messages = [{"role": "system", "content": SYSTEM_INSTRUCTION}]
+        # Re-inserting moves the session to the most recent end
+        self._sessions[session_id] = (now, messages)
+        while self._sessions:
+            oldest_id, (last_used, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) <= SESSION_MAX and now - last_used < SESSION_TTL_SEC:
+                break
+            del self._sessions[oldest_id]
+        return messages
+
+    async def _stream_completion(
+        self, updater: TaskUpdater, **kwargs: Any
+    ) -> tuple[str, List[Dict[str, Any]]]:
+        """Stream a chat completion, forwarding answer text as it arrives.
+
+        Returns the full content and the tool calls rebuilt as plain dicts.
+        Text is only forwarded while no tool call has started.
+        """
+        stream = await self._client.chat.completions.create(
+            model=self._model, stream=True, **kwargs
+        )
+        content_parts: List[str] = []
+        calls_by_index: Dict[int, Dict[str, Any]] = {}
+        # Index of the first unsent part, and the length of text not yet sent
+        flushed = 0
+        pending_len = 0
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            for tc_delta in delta.tool_calls or ():
+                call = calls_by_index.setdefault(
+                    tc_delta.index,
+                    {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
+                )
+                if tc_delta.id:
+                    call["id"] = tc_delta.id
+                if tc_delta.function:
+                    call["function"]["name"] += tc_delta.function.name or ""
+                    call["function"]["arguments"] += tc_delta.function.arguments or ""
+            if delta.content:
+                content_parts.append(delta.content)
+                pending_len += len(delta.content)
+                if not calls_by_index and pending_len >= STREAM_FLUSH_CHARS:
+                    await updater.update_status(
+                        TaskState.working,
+                        message=updater.new_agent_message(
+                            [TextPart(text="".join(content_parts[flushed:]))]
+                        ),
+                    )
+                    flushed = len(content_parts)
+                    pending_len = 0
+        tool_calls = [calls_by_index[i] for i in sorted(calls_by_index)]
+        return "".join(content_parts), tool_calls
+
+    async def _call_tool(self, func_name: str, func_args: Dict[str, Any]) -> tuple[str, bool]:
+        """Run a weather tool, reusing a recent result for the same arguments.
+
+        Returns the text for the model and whether the tool succeeded; failed
+        calls are never cached.
+        """
+        impl = self._tool_impl.get(func_name)
+        if impl is None:
+            return f"Unknown tool: {func_name}", False
+        key = (func_name, orjson.dumps(func_args, option=orjson.OPT_SORT_KEYS))
+        now = time.monotonic()
+        hit = self._tool_cache.get(key)
+        if hit is not None and now - hit[0] < TOOL_CACHE_TTL.get(func_name, 0.0):
+            logger.debug('Tool cache hit: %s %s', func_name, key[1])
+            return hit[1], True
+        try:
+            tool_output = str(await impl(**func_args))
+        except WeatherToolError as e:
+            return f"Error: {e}", False
+        if len(self._tool_cache) >= TOOL_CACHE_MAX:
+            self._tool_cache.clear()
+        self._tool_cache[key] = (now, tool_output)
+        return tool_output, True
+
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
         session_id = context.context_id
         if session_id in self._active_sessions:
@@ -215,12 +360,8 @@ class WeatherExecutor(AgentExecutor):
         raise ServerError(error=UnsupportedOperationError())
 
     def _flatten_parts_to_text(self, parts: List[Part]) -> str:
-        texts: List[str] = []
-        for p in parts:
-            root = p.root
-            if hasattr(root, 'text') and isinstance(root.text, str):
-                texts.append(root.text)
-            else:
-                texts.append('[non-text content omitted]')
-        return "\n".join(texts)
+        # Messages are almost always a single text part
+        if len(parts) == 1:
+            return _part_text(parts[0])
+        return "\n".join(_part_text(p) for p in parts)
 
@@ -12,6 +12,10 @@ from mcp.server.fastmcp import FastMCP
 # Initialize FastMCP server
 mcp = FastMCP('weather')
 
+
+class WeatherToolError(Exception):
+    """A tool could not produce a result; MCP reports it as an error result."""
+
 # --- Configuration & Constants ---
 BASE_URL = 'https://api.weather.gov'
 USER_AGENT = 'weather-agent'
@@ -101,7 +105,7 @@ async def get_alerts(state: str) -> str:
     """
     # Input validation and normalization
     if not isinstance(state, str) or len(state) != 2 or not state.isalpha():
-        return 'Invalid input. Please provide a two-letter US state code (e.g., CA).'
+        raise WeatherToolError('Invalid input. Please provide a two-letter US state code (e.g., CA).')
     state_code = state.upper()
 
     endpoint = f'/alerts/active/area/{state_code}'
@@ -109,7 +113,7 @@ async def get_alerts(state: str) -> str:
 
     if data is None:
         # Error occurred during request
-        return f'Failed to retrieve weather alerts for {state_code}.'
+        raise WeatherToolError(f'Failed to retrieve weather alerts for {state_code}.')
 
     features = data.get('features')
     if not features:  # Handles both null and empty list
@@ -129,20 +133,20 @@ async def get_forecast(latitude: float, longitude: float) -> str:
     """
     # Input validation
     if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
-        return 'Invalid latitude or longitude provided. Latitude must be between -90 and 90, Longitude between -180 and 180.'
+        raise WeatherToolError('Invalid latitude or longitude provided. Latitude must be between -90 and 90, Longitude between -180 and 180.')
 
     # NWS API requires latitude,longitude format with up to 4 decimal places
     point_endpoint = f'/points/{latitude:.4f},{longitude:.4f}'
     points_data = await get_weather_response(point_endpoint)
 
     if points_data is None or 'properties' not in points_data:
-        return f'Unable to retrieve NWS gridpoint information for {latitude:.4f},{longitude:.4f}.'
+        raise WeatherToolError(f'Unable to retrieve NWS gridpoint information for {latitude:.4f},{longitude:.4f}.')
 
     # Extract forecast URLs from the gridpoint data
     forecast_url = points_data['properties'].get('forecast')
 
     if not forecast_url:
-        return f'Could not find the NWS forecast endpoint for {latitude:.4f},{longitude:.4f}.'
+        raise WeatherToolError(f'Could not find the NWS forecast endpoint for {latitude:.4f},{longitude:.4f}.')
 
     # Make the request to the specific forecast URL
     forecast_data = None
@@ -160,11 +164,11 @@ async def get_forecast(latitude: float, longitude: float) -> str:
         pass  # Error handled by returning None below
 
     if forecast_data is None or 'properties' not in forecast_data:
-        return 'Failed to retrieve detailed forecast data from NWS.'
+        raise WeatherToolError('Failed to retrieve detailed forecast data from NWS.')
 
     periods = forecast_data['properties'].get('periods')
     if not periods:
-        return 'No forecast periods found for this location from NWS.'
+        raise WeatherToolError('No forecast periods found for this location from NWS.')
 
     # Format the first 5 periods
     forecasts = [format_forecast_period(period) for period in periods[:5]]
@@ -183,14 +187,14 @@ async def get_forecast_by_city(city: str, state: str) -> str:
     """
     # --- Input Validation ---
     if not city or not isinstance(city, str):
-        return 'Invalid city name provided.'
+        raise WeatherToolError('Invalid city name provided.')
     if (
         not state
         or not isinstance(state, str)
         or len(state) != 2
         or not state.isalpha()
     ):
-        return 'Invalid state code. Please provide the two-letter US state abbreviation (e.g., CA).'
+        raise WeatherToolError('Invalid state code. Please provide the two-letter US state abbreviation (e.g., CA).')
 
     city_name = city.strip()
     state_code = state.strip().upper()
@@ -203,17 +207,17 @@ async def get_forecast_by_city(city: str, state: str) -> str:
         # Synchronous geocode call
         location = geolocator.geocode(query, timeout=GEOCODE_TIMEOUT)
 
-    except GeocoderTimedOut:
-        return f"Could not get coordinates for '{city_name}, {state_code}': The location service timed out."
-    except GeocoderServiceError:
-        return f"Could not get coordinates for '{city_name}, {state_code}': The location service returned an error."
-    except Exception:
+    except GeocoderTimedOut as e:
+        raise WeatherToolError(f"Could not get coordinates for '{city_name}, {state_code}': The location service timed out.") from e
+    except GeocoderServiceError as e:
+        raise WeatherToolError(f"Could not get coordinates for '{city_name}, {state_code}': The location service returned an error.") from e
+    except Exception as e:
         # Catch any other unexpected errors during geocoding
-        return f"An unexpected error occurred while finding coordinates for '{city_name}, {state_code}'."
+        raise WeatherToolError(f"An unexpected error occurred while finding coordinates for '{city_name}, {state_code}'.") from e
 
     # --- Handle Geocoding Result ---
     if location is None:
-        return f"Could not find coordinates for '{city_name}, {state_code}'. Please check the spelling or try a nearby city."
+        raise WeatherToolError(f"Could not find coordinates for '{city_name}, {state_code}'. Please check the spelling or try a nearby city.")
 
     latitude = location.latitude
     longitude = location.longitude